@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+# Steps/second of the Euler stepping paths in src/ode_model.py:
+# pure (NumPy in-place loop), vectorized (simulate_batch, counted per trajectory step)
+# and compiled (Numba kernel, when numba is installed).
+# usage: ./bench-kernels.py [n_steps] [n_runs]
+import sys
+import time
+import numpy as np
+from src import ode_model as ode
+
+n_steps = int(sys.argv[1]) if len(sys.argv) > 1 else 10**6
+n_runs = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+p = ode.ParamsABC(k1_per_s=1.0, k2_per_s=0.5)
+x0 = np.array([1.0, 0.0, 0.0])
+dt_s = 1e-5
+
+
+def bench(label, fn, steps):
+    start = time.perf_counter()
+    out = fn()
+    elapsed = time.perf_counter() - start
+    print(f'{label:28s} {elapsed:8.3f} s  {steps/elapsed:12.3g} steps/s')
+    return out
+
+
+t_end_s = n_steps*dt_s
+X_pure = bench('pure (jit=False)', lambda: ode.simulate(x0, t_end_s, dt_s, p, jit=False, check_every=1000)[1], n_steps)
+
+n_batch = max(1, n_steps//n_runs)
+bench(f'vectorized ({n_runs} runs)', lambda: ode.simulate_batch(x0, n_batch*dt_s, dt_s, [p]*n_runs), n_batch*n_runs)
+
+if ode._euler_kernel_jit is None:
+    print('compiled: numba not installed')
+else:
+    ode.simulate(x0, 10*dt_s, dt_s, p, jit=True)  # compile (or load from cache) outside the timing
+    X_jit = bench('compiled (jit=True)', lambda: ode.simulate(x0, t_end_s, dt_s, p, jit=True)[1], n_steps)
+    print(f'compiled == pure: {np.array_equal(X_jit, X_pure)}')
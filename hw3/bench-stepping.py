@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+# Per-step overhead of the Euler loop in src/ode_model.py: the original
+# allocating loop vs. the preallocated, in-place fast path of simulate().
+# usage: ./bench-stepping.py [n_steps]   (default 10^6)
+import sys
+import time
+import numpy as np
+from src import ode_model as ode
+
+n_steps = int(sys.argv[1]) if len(sys.argv) > 1 else 10**6
+p = ode.ParamsABC(k1_per_s=1.0, k2_per_s=0.5)
+x0 = np.array([1.0, 0.0, 0.0])
+dt_s = 1e-5
+t_end_s = n_steps*dt_s
+
+
+def legacy(x0, t_end_s, dt_s, params):
+    # The loop simulate() used before: new arrays every step, checks every step.
+    t = np.arange(0, (t_end_s+dt_s), dt_s)
+    X = np.empty((t.shape[0], len(x0)))
+    X[0] = x0
+    for i in range(1, t.shape[0]):
+        X[i] = (ode.euler_step(X[i-1], params, dt_s))
+        if np.any(X[i] < -params.tol_neg):
+            raise ValueError('One or more concentrations in x0 are smaller than -tol_neg')
+        if np.any(abs(np.sum(X[i]) - np.sum(X[0])) > params.tol_mass):
+            raise ValueError('Total mass deviates from initial total mass by more than tol_mass')
+    return t, X
+
+
+def bench(label, fn):
+    start = time.perf_counter()
+    t, X = fn()
+    elapsed = time.perf_counter() - start
+    n = t.shape[0] - 1
+    print(f'{label:32s} {elapsed:8.2f} s  {1e9*elapsed/n:8.0f} ns/step')
+    return X
+
+
+print(f'{n_steps} Euler steps')
+X_ref = bench('before (allocating, check/step)', lambda: legacy(x0, t_end_s, dt_s, p))
+for ce in [1, 1000, 0]:
+    X = bench(f'in-place, check_every={ce}', lambda: ode.simulate(x0, t_end_s, dt_s, p, check_every=ce, jit=False))
+    assert np.array_equal(X, X_ref)
+bench('in-place, checks=False', lambda: ode.simulate(x0, t_end_s, dt_s, p, checks=False, jit=False))
@@ -0,0 +1,206 @@
+from __future__ import annotations
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import replace
+from multiprocessing import shared_memory
+import hashlib
+import os
+import pickle
+import numpy as np
+
+from .ode_model import simulate
+
+
+# Run status codes stored in the status buffer
+PENDING = 0
+DONE = 1
+FAILED = 2
+
+# Buffers attached once per worker process by _attach()
+_worker = {}
+
+
+def latin_hypercube(n, bounds, seed=None, log=False):
+    """
+    Latin-hypercube sample of n points: each dimension is cut into n equal strata and every stratum is used exactly once.
+
+    Args:
+    n:    number of samples.
+    bounds:    list of (low, high) pairs, one per dimension.
+    seed:    seed for np.random.default_rng, for reproducible designs.
+    log:    sample uniformly in log10 space (useful for rate constants spanning decades).
+
+    Output:
+    Returns an array of shape (n, len(bounds)).
+    """
+    rng = np.random.default_rng(seed)
+    bounds = np.asarray(bounds, dtype=float)
+    d = bounds.shape[0]
+    u = (np.argsort(rng.random((n, d)), axis=0) + rng.random((n, d)))/n
+    lo, hi = (np.log10(bounds[:, 0]), np.log10(bounds[:, 1])) if log else (bounds[:, 0], bounds[:, 1])
+    samples = lo + u*(hi - lo)
+    return 10**samples if log else samples
+
+
+def lhs_params(base, ranges, n, seed=None, log=True):
+    """
+    Latin-hypercube scan of ParamsABC fields.
+
+    Args:
+    base:    ParamsABC supplying the fields that are not scanned.
+    ranges:    dict {field name: (low, high)}, e.g. {'k1_per_s': (1, 1000), 'k2_per_s': (0.01, 1)}.
+    n, seed, log:    as in latin_hypercube().
+
+    Output:
+    Returns a list of n ParamsABC.
+    """
+    names = list(ranges)
+    samples = latin_hypercube(n, [ranges[k] for k in names], seed=seed, log=log)
+    return [replace(base, **dict(zip(names, map(float, row)))) for row in samples]
+
+
+def sensitivity_params(base, fields, rel_step=1e-3):
+    """
+    Parameter sets for one-at-a-time finite-difference sensitivities: base first, then base with each field scaled by (1 + rel_step).
+    """
+    return [base] + [replace(base, **{f: getattr(base, f)*(1 + rel_step)}) for f in fields]
+
+
+def _open_buffer(spec):
+    """
+    Open a result/status buffer described by spec = (kind, location, shape, dtype).
+    kind 'shm' is a multiprocessing SharedMemory block, kind 'file' a .npy file opened as a memmap.
+    Returns (array, handle); keep the handle alive as long as the array is used.
+    """
+    kind, location, shape, dtype = spec
+    if kind == 'shm':
+        shm = shared_memory.SharedMemory(name=location)
+        return np.ndarray(shape, dtype=dtype, buffer=shm.buf), shm
+    return np.load(location, mmap_mode='r+'), None
+
+
+def _attach(result_spec, status_spec):
+    _worker['X'], _worker['X_handle'] = _open_buffer(result_spec)
+    _worker['status'], _worker['status_handle'] = _open_buffer(status_spec)
+
+
+def _run_chunk(task):
+    """
+    Worker: simulate every run of one chunk and write trajectories and status straight into the shared buffers.
+    A run whose checks fail is marked FAILED (its rows are NaN) instead of stopping the scan.
+    """
+    indices, params_chunk, x0, t_end_s, dt_s, sim_kwargs = task
+    X = _worker['X']; status = _worker['status']
+    for i, params in zip(indices, params_chunk):
+        try:
+            X[i] = simulate(x0, t_end_s, dt_s, params, **sim_kwargs)[1]
+            status[i] = DONE
+        except ValueError:
+            X[i] = np.nan
+            status[i] = FAILED
+    if isinstance(X, np.memmap):
+        X.flush(); status.flush()
+    return len(indices)
+
+
+def run_ensemble(x0, t_end_s, dt_s, params_list, n_workers=None, chunk_size=64, checkpoint=None, **sim_kwargs):
+    """
+    Run simulate() for every parameter set in params_list over a process pool.
+
+    Runs are submitted in chunks of chunk_size. Workers write each trajectory directly into a shared result buffer at the run's index,
+    so results come back in the order of params_list and no arrays are pickled between processes.
+    With checkpoint set, the buffers are .npy files (checkpoint + '.X.npy' and checkpoint + '.status.npy'); rerunning with the same
+    arguments after the scan was killed only computes the runs that had not finished. checkpoint + '.key' holds a SHA-256 of the
+    arguments, and a checkpoint written with different ones raises ValueError instead of being resumed.
+
+    Args:
+    x0, t_end_s, dt_s:    as in simulate(); shared by every run.
+    params_list:    list of ParamsABC (or compiled networks), one per run.
+    n_workers:    number of processes (default os.cpu_count()). 1 runs everything in this process.
+    chunk_size:    runs per submitted task.
+    checkpoint:    path prefix for resumable on-disk buffers, or None for in-memory shared memory.
+    sim_kwargs:    extra keyword arguments for simulate(), e.g. method='exact'.
+
+    Output:
+    Returns the time grid t, an array X of shape (n_runs, len(t), len(x0)), and a boolean array failed of shape (n_runs,).
+    """
+    x0 = np.asarray(x0, dtype=float)
+    params_list = list(params_list)
+    n_runs = len(params_list)
+    t = np.arange(0, (t_end_s+dt_s), dt_s)
+    shape = (n_runs, t.shape[0], x0.shape[0])
+
+    if checkpoint is not None:
+        x_path = checkpoint + '.X.npy'; status_path = checkpoint + '.status.npy'; key_path = checkpoint + '.key'
+        # fingerprint of everything that determines the results, so a checkpoint is only resumed by the same scan
+        key = hashlib.sha256(pickle.dumps((x0, t_end_s, dt_s, params_list, sim_kwargs))).hexdigest()
+        resume = os.path.exists(x_path) and os.path.exists(status_path)
+        if resume:
+            stored = None
+            if os.path.exists(key_path):
+                with open(key_path) as f:
+                    stored = f.read().strip()
+            if stored != key:
+                raise ValueError(f'Checkpoint {x_path} was written for a different scan')
+        else:
+            with open(key_path, 'w') as f:
+                f.write(key + '\n')
+            np.lib.format.open_memmap(x_path, mode='w+', dtype=np.float64, shape=shape).flush()
+            np.lib.format.open_memmap(status_path, mode='w+', dtype=np.int8, shape=(n_runs,)).flush()
+        result_spec = ('file', x_path, shape, np.float64)
+        status_spec = ('file', status_path, (n_runs,), np.int8)
+    else:
+        shm_X = shared_memory.SharedMemory(create=True, size=max(1, int(np.prod(shape))*8))
+        shm_status = shared_memory.SharedMemory(create=True, size=max(1, n_runs))
+        np.ndarray((n_runs,), dtype=np.int8, buffer=shm_status.buf)[:] = PENDING
+        result_spec = ('shm', shm_X.name, shape, np.float64)
+        status_spec = ('shm', shm_status.name, (n_runs,), np.int8)
+
+    opened = []
+    try:
+        X, handle = _open_buffer(result_spec); opened.append(handle)
+        status, handle = _open_buffer(status_spec); opened.append(handle)
+        todo = np.flatnonzero(status == PENDING)
+        tasks = [(idx, [params_list[i] for i in idx], x0, t_end_s, dt_s, sim_kwargs)
+                 for idx in (todo[k:k + chunk_size] for k in range(0, len(todo), chunk_size))]
+        if n_workers == 1:
+            _attach(result_spec, status_spec)
+            for task in tasks:
+                _run_chunk(task)
+        elif tasks:
+            with ProcessPoolExecutor(max_workers=n_workers, initializer=_attach,
+                                     initargs=(result_spec, status_spec)) as pool:
+                for _ in pool.map(_run_chunk, tasks):
+                    pass
+        X_out = np.array(X)
+        failed = np.array(status) == FAILED
+    finally:
+        # drop every view into the buffers before closing them
+        opened += [_worker.get('X_handle'), _worker.get('status_handle')]
+        _worker.clear()
+        X = status = None
+        for handle in opened:
+            if handle is not None:
+                handle.close()
+        if checkpoint is None:
+            for shm in (shm_X, shm_status):
+                shm.close()
+                shm.unlink()
+    return t, X_out, failed
+
+
+def local_sensitivity(x0, t_end_s, dt_s, base, fields, rel_step=1e-3, **ensemble_kwargs):
+    """
+    One-at-a-time local sensitivities dX/d(ln p) of the trajectory to each ParamsABC field, by forward differences run as one ensemble.
+
+    Args:
+    x0, t_end_s, dt_s:    as in simulate().
+    base:    ParamsABC at which the sensitivities are evaluated.
+    fields:    list of field names, e.g. ['k1_per_s', 'k2_per_s'].
+    rel_step:    relative perturbation of each field.
+    ensemble_kwargs:    passed on to run_ensemble() (n_workers, method, ...).
+
+    Output:
+    Returns the time grid and a dict {field: array of shape (len(t), len(x0))}.
+    """
+    t, X, failed = run_ensemble(x0, t_end_s, dt_s, sensitivity_params(base, fields, rel_step), **ensemble_kwargs)
+    return t, {f: (X[i + 1] - X[0])/np.log1p(rel_step) for i, f in enumerate(fields)}
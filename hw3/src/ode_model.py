@@ -2,6 +2,11 @@ from __future__ import annotations
 from dataclasses import dataclass
 import numpy as np
 
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
 
 @dataclass
 class ParamsABC:
@@ -30,7 +35,7 @@ class ParamsABC:
     tol_neg: float  = 1e-12
 
 
-def dxdt(state, params):
+def dxdt(state, params, out=None):
     """
     Compute the derivative [dA/dt, dB/dt, dC/dt] for the sequential reaction A -> B -> C.
     Eqautions:
@@ -42,10 +47,18 @@ def dxdt(state, params):
     Args:
     state:    vector (numpy array) that holds the concentration of A, B, and C, respectively.
     params:    special container that holds four variables that can be accessed by name - two reaction rates k1_per_s and k2_per_s, and two parameters tol_mass and tol_neg that we will use later for checking our work. To access one of these variables, you can use the . operator, as in params.k1_per_s.
+    out:    optional length-3 array to write the result into instead of allocating a new one. May be the same array as state.
 
     Output:
     Returns a vector that contains [dA/dt, dB/dt, dC/dt] based on the current concentrations in state and the reaction rates in params.
     """
+    if out is not None:
+        rA = (params.k1_per_s)*state[0]
+        rB = (params.k2_per_s)*state[1]
+        out[0] = -rA
+        out[1] = rA - rB
+        out[2] = rB
+        return out
     A = state[0]; B = state[1]; C = state[2]
     dAdt = -(params.k1_per_s)*A
     dBdt = ((params.k1_per_s)*A) - ((params.k2_per_s)*B)
@@ -55,7 +68,7 @@ def dxdt(state, params):
     return np.array([dAdt, dBdt, dCdt])
 
 
-def euler_step(state, params, dt):
+def euler_step(state, params, dt, out=None):
     """
     Explicit Euler step for A -> B -> C.
     Computes the concentration at the next timestep based on the current concentration and its differential equation.
@@ -69,10 +82,16 @@ def euler_step(state, params, dt):
     state:    vector (numpy array) that holds the concentration of A, B, and C, respectively.
     params:    special container that holds four variables that can be accessed by name - two reaction rates k1_per_s and k2_per_s, and two parameters tol_mass and tol_neg that we will use later for checking our work. To access one of these variables, you can use the . operator, as in params.k1_per_s.
     dt:    time step in units of seconds
+    out:    optional length-3 array to write the result into instead of allocating a new one. Must not be the same array as state.
 
     Ouput: 
     Returns a vector that gives the updated concentrations [A, B, C] after one Euler step of dt seconds.
     """
+    if out is not None:
+        dxdt(state, params, out=out)
+        out *= dt
+        out += state
+        return out
     derivs = dxdt(state, params)
     A = state[0] + (derivs[0]*dt) 
     B = state[1] + (derivs[1]*dt)
@@ -80,7 +99,8 @@ def euler_step(state, params, dt):
     return np.array([A, B, C])
 
 
-def simulate(x0, t_end_s, dt_s, params, checks=True, clip_negative=False):
+def simulate(x0, t_end_s, dt_s, params, checks=True, clip_negative=False, method='euler',
+             rtol=1e-6, atol=1e-12, return_stats=False, check_every=1, jit=None):
     """
     Generic simulator with light numerical checks.
     Creates t, a time array from time 0 to t_end_s. Creates X, an array of simulated concentration values, with each row containing concentrations of A, B, and C at corresponding time points. The first row is x0.
@@ -92,29 +112,444 @@ def simulate(x0, t_end_s, dt_s, params, checks=True, clip_negative=False):
     t_end_s:    gives the final integration time in units of seconds.
     dt_s:    time step in units of seconds.
     params:    special container that holds four variables that can be accessed by name - two reaction rates k1_per_s and k2_per_s, and two parameters tol_mass and tol_neg that we will use later for checking our work. To access one of these variables, you can use the . operator, as in params.k1_per_s.
+                Can also be a compiled ReactionNetwork (src/reaction_network.py), in which case x0 holds one concentration per network species.
     checks:    boolean (input True or False) which will make this function perform a few simple tests 
                 If checks=True, then:
-                    Raise a ValueError if any concentration becomes smaller than -tol_neg
+                    Raise a ValueError if any concentration becomes smaller than -tol_neg (for the SOLVERS methods, -max(tol_neg, 10*atol))
                     Raise a ValueError if the total mass (A+B+C) deviates from (A0+B0+C0) by more than tol_mass
+    method:    how to advance the state.
+                'euler':    explicit Euler steps (default).
+                'propagator':    precompute the exact one-step matrix P(dt_s) once and apply X[i] = P @ X[i-1]. Exact at any dt_s.
+                'exact':    evaluate the exact propagator P(t) for every point of the time grid at once, with no stepping loop.
+                Any key of SOLVERS ('rk45', 'backward_euler'):    adaptive-step solver that picks its own internal steps from an error estimate and interpolates the result onto the dt_s grid.
+    rtol, atol:    relative and absolute error tolerances for the adaptive solvers.
+    return_stats:    if True, also return a SolverStats with the number of steps taken.
+    check_every:    for 'euler' and 'propagator', run the checks on the block of the last check_every steps at once instead of after every step. 0 runs them once, after the loop.
+    jit:    for 'euler' with ParamsABC, run the whole loop and its checks in a Numba-compiled kernel. None uses it whenever numba is importable,
+            True requires it (ValueError without numba, or for any other method or params), False always uses the NumPy loop.
+            The kernel checks after every step, so check_every is ignored on this path. Both paths give identical results.
 
     Output:
-    Returns the time grid (array) and an array with the simulated concentrations over time.
+    Returns the time grid (array) and an array with the simulated concentrations over time (plus SolverStats if return_stats=True).
     """
     t = np.arange(0,(t_end_s+dt_s), dt_s)
+    kernel = method == 'euler' and isinstance(params, ParamsABC)
+    if jit and not kernel:
+        raise ValueError("jit=True is only available for method='euler' with ParamsABC")
+    if jit and _euler_kernel_jit is None:
+        raise ValueError('jit=True needs numba, which is not installed')
+    if method in SOLVERS:
+        f, jac = _rhs(params)
+        X, stats = SOLVERS[method](f, np.asarray(x0, dtype=float), t, rtol=rtol, atol=atol, jac=jac)
+        if checks == True:
+            # The error control only resolves a species to about atol (per step, as an RMS over species), so one that
+            # decays to zero ends up a few atol either side of it; only undershoots beyond that count as negative.
+            _check_trajectory(X, params, tol_neg=max(params.tol_neg, 10*atol))
+        return (t, X, stats) if return_stats else (t, X)
+    if method in ('exact', 'propagator') and not isinstance(params, ParamsABC):
+        raise ValueError(f'method {method!r} is only available for ParamsABC')
+    if method == 'exact':
+        X = propagator(t, params) @ np.asarray(x0, dtype=float)
+        if checks == True:
+            _check_trajectory(X, params)
+        return (t, X, SolverStats()) if return_stats else (t, X)
+    if method == 'propagator':
+        P = propagator(dt_s, params)
+    elif method != 'euler':
+        raise ValueError(f'Unknown method {method!r}')
+
     X = np.empty((t.shape[0], len(x0)))
     X[0] = x0
-                
-    for i in range(1, t.shape[0]):
-        X[i] = (euler_step(X[i-1], params, dt_s))
+    if kernel and jit is not False and _euler_kernel_jit is not None:
+        i, failure = _euler_kernel_jit(X, params.k1_per_s, params.k2_per_s, dt_s, params.tol_neg, params.tol_mass,
+                                       checks == True)
+        if failure == 1:
+            raise ValueError(f'One or more concentrations in x0 are smaller than -tol_neg')
+        if failure == 2:
+            raise ValueError(f'Total mass deviates from initial total mass by more than tol_mass')
+        n = t.shape[0] - 1
+        return (t, X, SolverStats(n_steps=n, n_rhs=n)) if return_stats else (t, X)
+    mass0 = _total_mass(X[0], params)
+    step = _euler_stepper(params, dt_s)
+    n = t.shape[0]
+    block = check_every if check_every > 0 else n
+
+    # Steps write straight into the preallocated rows of X; checks run once per block.
+    for start in range(1, n, block):
+        stop = min(start + block, n)
+        for i in range(start, stop):
+            if method == 'propagator':
+                np.matmul(P, X[i-1], out=X[i])
+            else:
+                step(X[i-1], X[i])
         if checks == True:
-            if np.any(X[i] < -params.tol_neg):
-                raise ValueError(f'One or more concentrations in x0 are smaller than -tol_neg')
-            if np.any(abs(np.sum(X[i]) - np.sum(X[0])) > params.tol_mass):
-                raise ValueError(f'Total mass deviates from initial total mass by more than tol_mass')       
-    
+            _check_trajectory(X[start:stop], params, mass0)
+
+    if return_stats:
+        n = t.shape[0] - 1
+        return t, X, SolverStats(n_steps=n, n_rhs=n if method == 'euler' else 0)
     return t, X
 
 
+def _euler_kernel(X, k1, k2, dt, tol_neg, tol_mass, check):
+    """
+    The whole Euler loop for A -> B -> C on plain floats, filling X[1:] from X[0] in place.
+    Does the same floating-point operations, in the same order, as euler_step(out=...) and the simulate() checks,
+    so compiling it with numba changes the speed but not the result.
+    Returns (index of the first failing step, 1 for a negativity / 2 for a mass failure), or (-1, 0) if all checks pass.
+    """
+    mass0 = X[0, 0] + X[0, 1] + X[0, 2]
+    for i in range(1, X.shape[0]):
+        A = X[i-1, 0]; B = X[i-1, 1]; C = X[i-1, 2]
+        rA = k1*A
+        rB = k2*B
+        X[i, 0] = (-rA)*dt + A
+        X[i, 1] = (rA - rB)*dt + B
+        X[i, 2] = rB*dt + C
+        if check:
+            if X[i, 0] < -tol_neg or X[i, 1] < -tol_neg or X[i, 2] < -tol_neg:
+                return i, 1
+            if abs(X[i, 0] + X[i, 1] + X[i, 2] - mass0) > tol_mass:
+                return i, 2
+    return -1, 0
+
+
+# Compiled version of _euler_kernel, or None when numba is not installed
+_euler_kernel_jit = njit(cache=True)(_euler_kernel) if njit is not None else None
+
+
+def _rhs(params):
+    """
+    Right-hand side f(x, out=None) and Jacobian jac(x) for params, which is either a ParamsABC or a compiled ReactionNetwork.
+    """
+    if isinstance(params, ParamsABC):
+        return (lambda x, out=None: dxdt(x, params, out=out)), (lambda x: jacobian(x, params))
+    return params.dxdt, params.jacobian
+
+
+def _euler_stepper(params, dt):
+    """
+    In-place Euler step function step(state, out) for params (ParamsABC or a compiled ReactionNetwork).
+    """
+    if isinstance(params, ParamsABC):
+        return lambda x, out: euler_step(x, params, dt, out=out)
+    def step(x, out):
+        params.dxdt(x, out=out)
+        out *= dt
+        out += x
+        return out
+    return step
+
+
+def _total_mass(X, params):
+    """
+    Total mass of each state in X (last axis = species). Uses params.mass_weights when present, otherwise a plain sum.
+    """
+    weights = getattr(params, 'mass_weights', None)
+    return np.sum(X, axis=-1) if weights is None else X @ weights
+
+
+def _check_trajectory(X, params, mass0=None, tol_neg=None):
+    """
+    Run the simulate() checks on a whole trajectory X (rows are time points) at once.
+    mass0 is the initial total mass; it defaults to the total of the first row. tol_neg defaults to params.tol_neg.
+    Raises the same ValueErrors as the per-step checks in simulate().
+    """
+    if mass0 is None:
+        mass0 = _total_mass(X[0], params)
+    if tol_neg is None:
+        tol_neg = params.tol_neg
+    if np.any(X < -tol_neg):
+        raise ValueError(f'One or more concentrations in x0 are smaller than -tol_neg')
+    if np.any(abs(_total_mass(X, params) - mass0) > params.tol_mass):
+        raise ValueError(f'Total mass deviates from initial total mass by more than tol_mass')
+
+
+def _phi(d):
+    """
+    Numerically stable (1 - exp(-d))/d, equal to 1 at d = 0.
+    """
+    d = np.asarray(d, dtype=float)
+    small = np.abs(d) < 1e-8
+    safe = np.where(small, 1.0, d)
+    return np.where(small, 1.0 - d/2, -np.expm1(-safe)/safe)
+
+
+def propagator(t, params):
+    """
+    Exact propagator P(t) = expm(K*t) of the linear system A -> B -> C, so that x(t) = P(t) @ x(0).
+    Built from the closed-form solution instead of a general matrix exponential:
+        A(t) = A0*e1
+        B(t) = B0*e2 + A0*k1*(e1-e2)/(k2-k1)
+        C(t) = A0 + B0 + C0 - A(t) - B(t)
+    with e1 = exp(-k1*t), e2 = exp(-k2*t). The k1 == k2 case is handled without dividing by zero.
+    Units: t [s]; k1,k2 [1/s].
+
+    Args:
+    t:    a time (scalar) or an array of times in seconds.
+    params:    ParamsABC with the rate constants k1_per_s and k2_per_s.
+
+    Output:
+    Returns an array of shape t.shape + (3, 3).
+    """
+    t = np.asarray(t, dtype=float)
+    k1 = params.k1_per_s; k2 = params.k2_per_s
+    e1 = np.exp(-k1*t)
+    e2 = np.exp(-k2*t)
+    # k1*(e1-e2)/(k2-k1) rewritten as k1*t*exp(-min(k1,k2)*t)*phi(|k1-k2|*t), which never overflows
+    ab = k1*t*np.exp(-np.minimum(k1, k2)*t)*_phi(np.abs(k1 - k2)*t)
+
+    P = np.zeros(t.shape + (3, 3))
+    P[..., 0, 0] = e1
+    P[..., 1, 0] = ab
+    P[..., 1, 1] = e2
+    P[..., 2, 0] = 1.0 - e1 - ab
+    P[..., 2, 1] = 1.0 - e2
+    P[..., 2, 2] = 1.0
+    return P
+
+
+# ---------- Adaptive solver backends ----------
+
+@dataclass
+class SolverStats:
+    """
+    Work counters reported by the solver backends.
+
+    Attributes
+    ----------
+    n_steps: int
+        Accepted steps.
+    n_rejected: int
+        Steps rejected by the error control and retried with a smaller step.
+    n_rhs: int
+        Calls to the right-hand side f(x).
+    n_jac: int
+        Jacobian evaluations (implicit solvers only).
+    """
+
+    n_steps: int = 0
+    n_rejected: int = 0
+    n_rhs: int = 0
+    n_jac: int = 0
+
+
+def jacobian(state, params):
+    """
+    Jacobian d(dxdt)/d(state) of A -> B -> C. The system is linear, so this is the constant rate matrix K.
+    Units: k1,k2 [1/s].
+
+    Args:
+    state:    vector [A, B, C] (unused, kept so all Jacobians share one signature).
+    params:    ParamsABC with k1_per_s and k2_per_s.
+
+    Output:
+    Returns the 3x3 matrix K with dxdt(state) = K @ state.
+    """
+    k1 = params.k1_per_s; k2 = params.k2_per_s
+    return np.array([[-k1, 0.0, 0.0],
+                     [ k1, -k2, 0.0],
+                     [0.0,  k2, 0.0]])
+
+
+def _error_norm(err, x_old, x_new, rtol, atol):
+    """
+    RMS norm of the local error estimate, scaled so that 1.0 means "just within tolerance".
+    """
+    scale = atol + rtol*np.maximum(np.abs(x_old), np.abs(x_new))
+    return np.sqrt(np.mean((err/scale)**2))
+
+
+def _initial_step(x0, f0, span, rtol, atol):
+    """
+    Simple first-step guess: the time for the state to change by about its own tolerance.
+    """
+    scale = atol + rtol*np.abs(x0)
+    d0 = np.sqrt(np.mean((x0/scale)**2))
+    d1 = np.sqrt(np.mean((f0/scale)**2))
+    h = 1e-6 if d0 < 1e-5 or d1 < 1e-5 else 0.01*d0/d1
+    return min(h, span)
+
+
+def _interval(t_nodes, t_out):
+    """
+    For every output time, the index i of the step [t_nodes[i], t_nodes[i+1]] containing it and the fraction s of the way through that step.
+    """
+    i = np.clip(np.searchsorted(t_nodes, t_out, side='right') - 1, 0, len(t_nodes) - 2)
+    h = (t_nodes[i+1] - t_nodes[i])[:, None]
+    return i, h, ((t_out - t_nodes[i])[:, None])/h
+
+
+def _linear(t_nodes, X_nodes, t_out):
+    """
+    Linear interpolation of accepted solver steps onto the output grid t_out.
+    Matches the order of backward Euler and, unlike a cubic, never overshoots below zero.
+    """
+    t_nodes = np.asarray(t_nodes); X_nodes = np.asarray(X_nodes)
+    i, h, s = _interval(t_nodes, t_out)
+    return (1 - s)*X_nodes[i] + s*X_nodes[i+1]
+
+
+def _hermite(t_nodes, X_nodes, F_nodes, t_out):
+    """
+    Cubic Hermite interpolation of accepted solver steps onto the output grid t_out.
+    Uses the state and its derivative at both ends of each step, so it is exact at the nodes and third-order in between.
+    """
+    t_nodes = np.asarray(t_nodes); X_nodes = np.asarray(X_nodes); F_nodes = np.asarray(F_nodes)
+    i, h, s = _interval(t_nodes, t_out)
+    h00 = 2*s**3 - 3*s**2 + 1
+    h10 = s**3 - 2*s**2 + s
+    h01 = -2*s**3 + 3*s**2
+    h11 = s**3 - s**2
+    return h00*X_nodes[i] + h10*h*F_nodes[i] + h01*X_nodes[i+1] + h11*h*F_nodes[i+1]
+
+
+# Dormand-Prince 5(4) tableau
+_DP_C = np.array([0, 1/5, 3/10, 4/5, 8/9, 1, 1])
+_DP_A = [np.array([]),
+         np.array([1/5]),
+         np.array([3/40, 9/40]),
+         np.array([44/45, -56/15, 32/9]),
+         np.array([19372/6561, -25360/2187, 64448/6561, -212/729]),
+         np.array([9017/3168, -355/33, 46732/5247, 49/176, -5103/18656]),
+         np.array([35/384, 0, 500/1113, 125/192, -2187/6784, 11/84])]
+_DP_B = np.array([35/384, 0, 500/1113, 125/192, -2187/6784, 11/84, 0])
+_DP_E = _DP_B - np.array([5179/57600, 0, 7571/16695, 393/640, -92097/339200, 187/2100, 1/40])
+
+
+def rk45(f, x0, t, rtol=1e-6, atol=1e-12, jac=None):
+    """
+    Adaptive explicit Runge-Kutta (Dormand-Prince 5(4)) solver.
+    The difference between the embedded 5th- and 4th-order solutions estimates the local error, which sets the next step size.
+
+    Args:
+    f:    right-hand side, f(x) returns dx/dt.
+    x0:    initial state.
+    t:    increasing output grid; integration runs from t[0] to t[-1].
+    rtol, atol:    relative and absolute error tolerances.
+    jac:    ignored, accepted so all backends share one signature.
+
+    Output:
+    Returns X, the solution interpolated onto t (one row per time point), and a SolverStats.
+    """
+    stats = SolverStats()
+    t0, t_end = t[0], t[-1]
+    x = np.asarray(x0, dtype=float)
+    fx = f(x); stats.n_rhs += 1
+    t_nodes = [t0]; X_nodes = [x]; F_nodes = [fx]
+    h = _initial_step(x, fx, t_end - t0, rtol, atol)
+    tc = t0
+    K = np.empty((7, x.shape[0]))
+    while tc < t_end:
+        h = min(h, t_end - tc)
+        K[0] = fx
+        for j in range(1, 7):
+            K[j] = f(x + h*(_DP_A[j] @ K[:j]))
+        stats.n_rhs += 6
+        x_new = x + h*(_DP_B[:6] @ K[:6])
+        err = _error_norm(h*(_DP_E @ K), x, x_new, rtol, atol)
+        if err <= 1.0:
+            tc += h
+            x = x_new; fx = K[6].copy()
+            t_nodes.append(tc); X_nodes.append(x); F_nodes.append(fx)
+            stats.n_steps += 1
+        else:
+            stats.n_rejected += 1
+        h *= min(5.0, max(0.2, 0.9*err**(-1/5) if err > 0 else 5.0))
+    if len(t_nodes) == 1:
+        return np.tile(x, (len(t), 1)), stats
+    return _hermite(t_nodes, X_nodes, F_nodes, t), stats
+
+
+def _fd_jacobian(f, x, fx):
+    """
+    Forward-difference Jacobian, used when no analytic Jacobian is supplied.
+    """
+    J = np.empty((x.shape[0], x.shape[0]))
+    for j in range(x.shape[0]):
+        dx = 1e-8*max(1.0, abs(x[j]))
+        xp = x.copy(); xp[j] += dx
+        J[:, j] = (f(xp) - fx)/dx
+    return J
+
+
+def _newton_solver(J, h):
+    """
+    Factorize the Newton matrix M = I - h*J once per step and return a function that solves M @ dy = r.
+    Sparse Jacobians (anything with .tocsc(), e.g. from a sparse ReactionNetwork) use a sparse LU from scipy.
+    """
+    if hasattr(J, 'tocsc'):
+        from scipy.sparse import identity
+        from scipy.sparse.linalg import splu
+        return splu((identity(J.shape[0], format='csc') - h*J).tocsc()).solve
+    M = np.eye(J.shape[0]) - h*J
+    return lambda r: np.linalg.solve(M, r)
+
+
+def backward_euler(f, x0, t, rtol=1e-6, atol=1e-12, jac=None, max_newton=10):
+    """
+    Adaptive implicit (backward) Euler solver for stiff systems.
+    Each step solves x_new = x + h*f(x_new) with Newton's method. The local error is estimated as h/2*(f(x_new) - f(x)), which sets the next step size.
+    Being L-stable, it can take steps much larger than 1/k1 once the fast species has decayed.
+
+    Args:
+    f:    right-hand side, f(x) returns dx/dt.
+    x0:    initial state.
+    t:    increasing output grid; integration runs from t[0] to t[-1].
+    rtol, atol:    relative and absolute error tolerances.
+    jac:    Jacobian, jac(x) returns df/dx (dense array or scipy.sparse matrix). Finite differences are used if None.
+    max_newton:    maximum Newton iterations per step before the step is rejected.
+
+    Output:
+    Returns X, the solution interpolated onto t (one row per time point), and a SolverStats.
+    """
+    stats = SolverStats()
+    t0, t_end = t[0], t[-1]
+    x = np.asarray(x0, dtype=float)
+    fx = f(x); stats.n_rhs += 1
+    t_nodes = [t0]; X_nodes = [x]
+    h = _initial_step(x, fx, t_end - t0, rtol, atol)
+    tc = t0
+    while tc < t_end:
+        h = min(h, t_end - tc)
+        J = jac(x) if jac is not None else _fd_jacobian(f, x, fx)
+        stats.n_jac += 1
+        solve = _newton_solver(J, h)
+        y = x + h*fx
+        converged = False
+        for _ in range(max_newton):
+            fy = f(y); stats.n_rhs += 1
+            dy = solve(-(y - x - h*fy))
+            y = y + dy
+            if _error_norm(dy, x, y, rtol, atol) < 1e-3:
+                converged = True
+                break
+        if not converged:
+            stats.n_rejected += 1
+            h *= 0.25
+            continue
+        fy = f(y); stats.n_rhs += 1
+        err = _error_norm(0.5*h*(fy - fx), x, y, rtol, atol)
+        if err <= 1.0:
+            tc += h
+            x = y; fx = fy
+            t_nodes.append(tc); X_nodes.append(x)
+            stats.n_steps += 1
+        else:
+            stats.n_rejected += 1
+        h *= min(5.0, max(0.2, 0.9*err**(-1/2) if err > 0 else 5.0))
+    if len(t_nodes) == 1:
+        return np.tile(x, (len(t), 1)), stats
+    return _linear(t_nodes, X_nodes, t), stats
+
+
+# Solver backends usable as simulate(..., method=<key>)
+SOLVERS = {
+    'rk45': rk45,
+    'backward_euler': backward_euler,
+}
+
+
 # ---------- Reference (analytic) solutions ----------
 
 def analytic_A(t, A0, k1):
@@ -144,8 +579,188 @@ def analytic_C(t, A0, k1, k2):
     """
     Analytical solution for C(t) in A -> B -> C with A0, B0=0, C0=0 initial.
     Equation:
-    C(t) = A0*(1-((k2/(k2-1))*np.exp(-k1*t))-((k1/(k1-k2))*np.exp(-k2*t)))
+    C(t) = A0*(1-((k2/(k2-k1))*np.exp(-k1*t))-((k1/(k1-k2))*np.exp(-k2*t)))
     Units: A0, B0, C0 [µM]; t, [s]; k1,k2 [1/s].
     """
 
-    return A0*(1-((k2/(k2-1))*np.exp(-k1*t))-((k1/(k1-k2))*np.exp(-k2*t)))
+    return A0*(1-((k2/(k2-k1))*np.exp(-k1*t))-((k1/(k1-k2))*np.exp(-k2*t)))
+
+
+# ---------- Batched simulation for parameter sweeps ----------
+
+def _batch_params(params, n_runs):
+    """
+    Turn params into per-run arrays (k1, k2, tol_mass, tol_neg), each of shape (n_runs,).
+
+    Args:
+    params:    either a sequence of ParamsABC (one per run), or a single ParamsABC whose fields may be scalars or arrays that broadcast to n_runs.
+    n_runs:    number of trajectories in the batch.
+
+    Output:
+    Returns a tuple of four float arrays of shape (n_runs,).
+    """
+    if isinstance(params, ParamsABC):
+        fields = (params.k1_per_s, params.k2_per_s, params.tol_mass, params.tol_neg)
+    else:
+        params = list(params)
+        if len(params) != n_runs:
+            raise ValueError(f'Got {len(params)} parameter sets for {n_runs} runs')
+        fields = ([p.k1_per_s for p in params], [p.k2_per_s for p in params],
+                  [p.tol_mass for p in params], [p.tol_neg for p in params])
+    return tuple(np.broadcast_to(np.asarray(f, dtype=float), (n_runs,)) for f in fields)
+
+
+def dxdt_batch(states, k1, k2):
+    """
+    Vectorized dxdt for many trajectories at once.
+    Same equations as dxdt, evaluated row by row.
+    Units: A,B,C [µM]; k1,k2 [1/s].
+
+    Args:
+    states:    array of shape (n_runs, 3), each row holds [A, B, C] for one run.
+    k1, k2:    arrays of shape (n_runs,) (or scalars) with the rate constants of each run.
+
+    Output:
+    Returns an array of shape (n_runs, 3) with [dA/dt, dB/dt, dC/dt] for every run.
+    """
+    rA = k1*states[:, 0]
+    rB = k2*states[:, 1]
+    return np.stack([-rA, rA - rB, rB], axis=1)
+
+
+def simulate_batch(x0, t_end_s, dt_s, params, checks=True):
+    """
+    Run many A -> B -> C simulations in lockstep.
+    All trajectories share the same time grid as simulate(); every Euler step advances the whole (n_runs x 3) state array at once.
+    Checks are evaluated across the batch. A run that fails a check does not stop the sweep; it is flagged in the returned failed mask instead.
+
+    Units: x0,X [µM]; t,t_end_s,dt_s [s]; k1,k2 [1/s].
+
+    Args:
+    x0:    initial concentrations, either one [A0, B0, C0] shared by every run or an array of shape (n_runs, 3).
+    t_end_s:    gives the final integration time in units of seconds.
+    dt_s:    time step in units of seconds.
+    params:    a list of ParamsABC (one per run), or a single ParamsABC whose fields may be arrays of length n_runs, e.g. ParamsABC(k1_per_s=k1_grid, k2_per_s=k2_grid).
+    checks:    boolean. If True, a run is marked as failed when any concentration becomes smaller than -tol_neg or its total mass deviates from its initial total mass by more than tol_mass.
+
+    Output:
+    Returns the time grid t, an array X of shape (len(t), n_runs, 3) with the simulated concentrations, and a boolean array failed of shape (n_runs,).
+    """
+    x0 = np.atleast_2d(np.asarray(x0, dtype=float))
+    if isinstance(params, ParamsABC):
+        n_runs = np.broadcast_shapes(x0.shape[:1], np.shape(params.k1_per_s), np.shape(params.k2_per_s))
+        n_runs = n_runs[0] if n_runs else 1
+    else:
+        n_runs = max(x0.shape[0], len(params))
+    k1, k2, tol_mass, tol_neg = _batch_params(params, n_runs)
+
+    t = np.arange(0, (t_end_s+dt_s), dt_s)
+    X = np.empty((t.shape[0], n_runs, x0.shape[1]))
+    X[0] = np.broadcast_to(x0, (n_runs, x0.shape[1]))
+    mass0 = X[0].sum(axis=1)
+    failed = np.zeros(n_runs, dtype=bool)
+
+    for i in range(1, t.shape[0]):
+        X[i] = X[i-1] + dxdt_batch(X[i-1], k1, k2)*dt_s
+        if checks:
+            failed |= np.any(X[i] < -tol_neg[:, None], axis=1)
+            failed |= np.abs(X[i].sum(axis=1) - mass0) > tol_mass
+
+    return t, X, failed
+
+
+# ---------- Streaming output for long runs ----------
+
+def _n_points(t_end_s, dt_s):
+    """
+    Number of points on the simulate() time grid np.arange(0, t_end_s+dt_s, dt_s), without building it.
+    """
+    return int(np.ceil((t_end_s + dt_s)/dt_s))
+
+
+def simulate_chunks(x0, t_end_s, dt_s, params, chunk_size=10000, stride=1, checks=True, method='euler'):
+    """
+    Generator version of simulate() that yields the trajectory in chunks, keeping memory constant regardless of the number of steps.
+    Only every stride-th time point is kept. Internally the steps are computed into a fixed scratch block of chunk_size*stride rows,
+    which is checked exactly like simulate() does, then decimated and yielded.
+
+    Units: x0,X [µM]; t,t_end_s,dt_s [s]; k1,k2 [1/s].
+
+    Args:
+    x0:    specifies the initial concentrations [A0, B0, C0].
+    t_end_s:    gives the final integration time in units of seconds.
+    dt_s:    time step in units of seconds.
+    params:    ParamsABC with the rate constants and check tolerances, or a compiled ReactionNetwork.
+    chunk_size:    maximum number of output rows per yielded chunk.
+    stride:    keep every stride-th point of the dt_s grid (the first point is always kept).
+    checks:    boolean, same checks as simulate(); raises ValueError on the first failing block.
+    method:    'euler', 'propagator' or 'exact', as in simulate().
+
+    Output:
+    Yields (t, X) pairs: the output times of the chunk and the concentrations at those times, one row per time point.
+    Concatenating all chunks gives simulate(...)[0][::stride] and simulate(...)[1][::stride].
+    """
+    x0 = np.asarray(x0, dtype=float)
+    n = _n_points(t_end_s, dt_s)
+    block = chunk_size*stride
+
+    if method in ('exact', 'propagator') and not isinstance(params, ParamsABC):
+        raise ValueError(f'method {method!r} is only available for ParamsABC')
+    if method == 'exact':
+        for first in range(0, n, block):
+            t = np.arange(first, min(first + block, n), stride)*dt_s
+            X = propagator(t, params) @ x0
+            if checks == True:
+                _check_trajectory(X, params, _total_mass(x0, params))
+            yield t, X
+        return
+    if method == 'propagator':
+        P = propagator(dt_s, params)
+    elif method != 'euler':
+        raise ValueError(f'Unknown method {method!r}')
+
+    buf = np.empty((block + 1, x0.shape[0]))
+    buf[0] = x0
+    mass0 = _total_mass(x0, params)
+    step = _euler_stepper(params, dt_s)
+    yield np.zeros(1), x0[None, :].copy()
+
+    # buf[0] holds the state at global index g0; steps g0+1 .. g0+m go into buf[1 .. m]
+    g0 = 0
+    while g0 < n - 1:
+        m = min(block, n - 1 - g0)
+        for i in range(1, m + 1):
+            if method == 'propagator':
+                np.matmul(P, buf[i-1], out=buf[i])
+            else:
+                step(buf[i-1], buf[i])
+        if checks == True:
+            _check_trajectory(buf[1:m+1], params, mass0)
+        first = -(-(g0 + 1)//stride)*stride
+        if first <= g0 + m:
+            yield np.arange(first, g0 + m + 1, stride)*dt_s, buf[first-g0:m+1:stride].copy()
+        buf[0] = buf[m]
+        g0 += m
+
+
+def simulate_to_file(path, x0, t_end_s, dt_s, params, stride=1, chunk_size=10000, checks=True, method='euler'):
+    """
+    Run simulate_chunks() and write the decimated trajectory into a memory-mapped .npy file as it is produced.
+    Memory use stays at one chunk no matter how long the run is; the result can be reopened later with np.load(path, mmap_mode='r').
+
+    Args:
+    path:    output .npy file; holds an array of shape (n_out, 3).
+    x0, t_end_s, dt_s, params, stride, chunk_size, checks, method:    as in simulate_chunks().
+
+    Output:
+    Returns the output time grid and the memory-mapped array of concentrations.
+    """
+    n_out = len(range(0, _n_points(t_end_s, dt_s), stride))
+    X = np.lib.format.open_memmap(path, mode='w+', dtype=np.float64, shape=(n_out, len(x0)))
+    row = 0
+    for t_chunk, X_chunk in simulate_chunks(x0, t_end_s, dt_s, params, chunk_size=chunk_size,
+                                            stride=stride, checks=checks, method=method):
+        X[row:row + len(X_chunk)] = X_chunk
+        row += len(X_chunk)
+    X.flush()
+    return np.arange(n_out)*stride*dt_s, X
@@ -0,0 +1,198 @@
+from __future__ import annotations
+from dataclasses import dataclass
+import numpy as np
+
+
+@dataclass
+class Reaction:
+    """
+    One mass-action reaction, e.g. A + B -> C.
+
+    Attributes
+    ----------
+    reactants: tuple
+        Species names consumed. Repeat a name for higher order, e.g. ('A', 'A') for 2A.
+    products: tuple
+        Species names produced, repeated the same way.
+    rate: str or float
+        Rate constant, either a value or the name of an entry in the network's rate_constants.
+
+    Notes
+    -----
+    Rate law: v = k * prod(x[r] for r in reactants).
+    """
+
+    reactants: tuple
+    products: tuple
+    rate: str | float
+
+
+class ReactionNetwork:
+    """
+    A mass-action reaction network compiled once into arrays, so that one derivative call is a gather, a product and a matrix-vector product
+    regardless of network size.
+
+    Compiled arrays
+    ---------------
+    S: (n_species, n_reactions) stoichiometry matrix, net change of each species per reaction.
+    reactant_index: (n_reactions, max_order) species index of each reactant slot. Unused slots point at an extra constant 1.0 entry
+        at position n_species, so every rate is k * prod(x_padded[reactant_index], axis=1).
+    k: (n_reactions,) rate constants.
+
+    Can be passed as params to ode_model.simulate(), simulate_chunks() and the SOLVERS backends; it carries its own tol_mass and tol_neg.
+
+    With sparse=True, S and the Jacobian are scipy.sparse CSR matrices, so memory and per-step cost scale with the number of
+    reactions instead of n_species**2. backward_euler then factorizes the sparse Newton matrix instead of a dense one.
+    """
+
+    def __init__(self, species, reactions, rate_constants=None, mass_weights=None, tol_mass=1e-9, tol_neg=1e-12,
+                 sparse=False):
+        """
+        Args:
+        species:    list of species names; the order defines the state vector.
+        reactions:    list of Reaction, or (reactants, products, rate) tuples.
+        rate_constants:    dict of named rate constants used by the reactions.
+        mass_weights:    optional weight per species (e.g. monomer count of a complex) whose weighted sum the mass check uses.
+                        Defaults to all ones. If the weighted sum is not conserved by every reaction, the mass check is turned off (tol_mass = inf).
+        tol_mass, tol_neg:    tolerances for the simulate() checks, as in ParamsABC.
+        sparse:    store S and return Jacobians as scipy.sparse CSR matrices (requires scipy).
+        """
+        self.species = list(species)
+        self.reactions = [r if isinstance(r, Reaction) else Reaction(*r) for r in reactions]
+        self.rate_constants = dict(rate_constants or {})
+        self.tol_neg = tol_neg
+        index = {s: i for i, s in enumerate(self.species)}
+        n_s = len(self.species); n_r = len(self.reactions)
+
+        max_order = max([len(r.reactants) for r in self.reactions] + [1])
+        self.reactant_index = np.full((n_r, max_order), n_s, dtype=np.intp)
+        S_rows = []; S_cols = []; S_vals = []
+        for j, r in enumerate(self.reactions):
+            for slot, name in enumerate(r.reactants):
+                self.reactant_index[j, slot] = index[name]
+                S_rows.append(index[name]); S_cols.append(j); S_vals.append(-1.0)
+            for name in r.products:
+                S_rows.append(index[name]); S_cols.append(j); S_vals.append(1.0)
+        self.sparse = sparse
+        if sparse:
+            from scipy import sparse as sp_sparse
+            # duplicate entries are summed, then exact cancellations (A -> A + B) dropped
+            self.S = sp_sparse.csr_matrix((S_vals, (S_rows, S_cols)), shape=(n_s, n_r))
+            self.S.eliminate_zeros()
+            self._compile_jacobian()
+        else:
+            self.S = np.zeros((n_s, n_r))
+            np.add.at(self.S, (S_rows, S_cols), S_vals)
+        self.k = np.array([self._rate_value(r.rate) for r in self.reactions], dtype=float)
+
+        self.mass_weights = np.ones(n_s) if mass_weights is None else np.asarray(mass_weights, dtype=float)
+        conserved = np.allclose(self.S.T @ self.mass_weights, 0.0)
+        self.tol_mass = tol_mass if conserved else np.inf
+        self._xpad = np.ones(n_s + 1)
+
+    def _rate_value(self, rate):
+        return self.rate_constants[rate] if isinstance(rate, str) else float(rate)
+
+    @property
+    def n_species(self):
+        return len(self.species)
+
+    def set_rates(self, **rate_constants):
+        """
+        Update named rate constants without recompiling the network, e.g. net.set_rates(kf=1e-4).
+        """
+        self.rate_constants.update(rate_constants)
+        self.k = np.array([self._rate_value(r.rate) for r in self.reactions], dtype=float)
+
+    def state(self, concentrations):
+        """
+        Build a state vector from a dict {species name: concentration}; species not listed start at 0.
+        """
+        x = np.zeros(self.n_species)
+        for name, value in concentrations.items():
+            x[self.species.index(name)] = value
+        return x
+
+    def rates(self, state):
+        """
+        Mass-action rate of every reaction at the given state.
+        """
+        self._xpad[:-1] = state
+        return self.k*np.prod(self._xpad[self.reactant_index], axis=1)
+
+    def dxdt(self, state, out=None):
+        """
+        Time derivative of every species, S @ rates(state). Writes into out if given.
+        """
+        if self.sparse:
+            dx = self.S @ self.rates(state)
+            if out is None:
+                return dx
+            out[:] = dx
+            return out
+        return np.matmul(self.S, self.rates(state), out=out)
+
+    def _rate_derivatives(self, state):
+        """
+        d(rate_j)/d(x) for every reactant slot: an (n_reactions, max_order) array whose [j, slot] entry is
+        k_j times the product of the other slots' concentrations.
+        """
+        self._xpad[:-1] = state
+        factors = self._xpad[self.reactant_index]
+        order = factors.shape[1]
+        dv = np.empty_like(factors)
+        for slot in range(order):
+            dv[:, slot] = np.prod(np.delete(factors, slot, axis=1), axis=1)
+        return self.k[:, None]*dv
+
+    def _compile_jacobian(self):
+        """
+        Precompute the sparsity pattern of J = S @ D for mass-action kinetics, with D[j, i] = d(rate_j)/d(x_i).
+        J[i, c] collects S[i, j] * d(rate_j)/d(x_c) over every reaction j that has species c in one of its reactant slots.
+        Every such (S entry, reactant slot) pair is mapped once to its position in J.data, so jacobian() is a gather,
+        a multiply and a bincount.
+        """
+        from scipy import sparse as sp_sparse
+        n_s = self.n_species
+        S_csc = self.S.tocsc()
+        pair_j = []; pair_slot = []; pair_coef = []; pair_row = []; pair_col = []
+        for j in range(self.S.shape[1]):
+            rows = S_csc.indices[S_csc.indptr[j]:S_csc.indptr[j+1]]
+            vals = S_csc.data[S_csc.indptr[j]:S_csc.indptr[j+1]]
+            for slot, c in enumerate(self.reactant_index[j]):
+                if c == n_s:
+                    continue
+                pair_j.extend([j]*len(rows)); pair_slot.extend([slot]*len(rows))
+                pair_coef.extend(vals); pair_row.extend(rows); pair_col.extend([c]*len(rows))
+        pattern = sp_sparse.csr_matrix((np.ones(len(pair_row)), (pair_row, pair_col)), shape=(n_s, n_s))
+        pattern.sum_duplicates()
+        pattern.sort_indices()
+        # position of each (row, col) pair inside pattern.data; row-major keys of a sorted CSR are increasing
+        pattern_keys = np.repeat(np.arange(n_s), np.diff(pattern.indptr))*n_s + pattern.indices
+        pos = np.searchsorted(pattern_keys, np.asarray(pair_row, dtype=np.intp)*n_s + np.asarray(pair_col, dtype=np.intp))
+        self._jac_indices = pattern.indices
+        self._jac_indptr = pattern.indptr
+        self._jac_pos = pos
+        self._jac_j = np.asarray(pair_j, dtype=np.intp)
+        self._jac_slot = np.asarray(pair_slot, dtype=np.intp)
+        self._jac_coef = np.asarray(pair_coef, dtype=float)
+
+    def jacobian(self, state):
+        """
+        Analytic Jacobian d(dxdt)/d(state) = S @ D, with D[j, i] = d(rate_j)/d(x_i).
+        For each reactant slot the derivative of the product is the product over the other slots.
+        Returns a dense array, or a CSR matrix when the network was built with sparse=True.
+        """
+        dv = self._rate_derivatives(state)
+        if self.sparse:
+            from scipy import sparse as sp_sparse
+            data = np.bincount(self._jac_pos, weights=self._jac_coef*dv[self._jac_j, self._jac_slot],
+                               minlength=len(self._jac_indices))
+            return sp_sparse.csr_matrix((data, self._jac_indices, self._jac_indptr),
+                                        shape=(self.n_species, self.n_species))
+        n_r, order = dv.shape
+        D = np.zeros((n_r, self.n_species + 1))
+        rows = np.arange(n_r)
+        for slot in range(order):
+            np.add.at(D, (rows, self.reactant_index[:, slot]), dv[:, slot])
+        return self.S @ D[:, :-1]
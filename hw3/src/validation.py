@@ -0,0 +1,78 @@
+from __future__ import annotations
+import time
+import numpy as np
+
+from .ode_model import SOLVERS, _phi, simulate
+
+
+def analytic_solution(t, A0, k1, k2):
+    """
+    Analytic [A, B, C](t) for A -> B -> C with B0 = C0 = 0, evaluated over broadcast grids of (t, A0, k1, k2).
+    Same solution as analytic_A/B/C, but B is written as A0*k1*t*exp(-min(k1,k2)*t)*phi(|k1-k2|*t) with phi(d) = (1-exp(-d))/d,
+    which stays accurate when k1 ~= k2 (where k1/(k2-k1) blows up), and C = A0 - A - B keeps the mass exact.
+    Units: A0 [µM]; t [s]; k1,k2 [1/s].
+
+    Args:
+    t, A0, k1, k2:    scalars or arrays that broadcast together, e.g. t[:, None] against k1[None, :].
+
+    Output:
+    Returns an array of shape broadcast(t, A0, k1, k2).shape + (3,).
+    """
+    t, A0, k1, k2 = np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in (t, A0, k1, k2)))
+    A = A0*np.exp(-k1*t)
+    B = A0*k1*t*np.exp(-np.minimum(k1, k2)*t)*_phi(np.abs(k1 - k2)*t)
+    return np.stack([A, B, A0 - A - B], axis=-1)
+
+
+def error_norms(X, X_ref):
+    """
+    Error norms of a trajectory X against a reference X_ref (rows are time points).
+
+    Output:
+    Returns a dict with 'max' (largest absolute error anywhere), 'rms' (root-mean-square over all entries)
+    and 'final' (largest absolute error at the last time point).
+    """
+    err = np.abs(np.asarray(X) - np.asarray(X_ref))
+    return {'max': float(err.max()), 'rms': float(np.sqrt(np.mean(err**2))), 'final': float(err[-1].max())}
+
+
+def observed_order(dt_values, errors):
+    """
+    Convergence order p from a least-squares fit of log(error) = p*log(dt) + c.
+    """
+    dt_values = np.asarray(dt_values, dtype=float); errors = np.asarray(errors, dtype=float)
+    ok = errors > 0
+    if ok.sum() < 2:
+        return np.nan
+    return float(np.polyfit(np.log(dt_values[ok]), np.log(errors[ok]), 1)[0])
+
+
+def convergence_study(A0, t_end_s, dt_values, params, methods=None, **sim_kwargs):
+    """
+    Run simulate() for every method and dt and compare against the analytic solution on the same grid.
+
+    Args:
+    A0:    initial A (B0 = C0 = 0, as the analytic solution assumes).
+    t_end_s:    final integration time in seconds.
+    dt_values:    list of output/step sizes dt_s to try.
+    params:    ParamsABC.
+    methods:    list of simulate() methods; defaults to every mode ('euler', 'propagator', 'exact' and all SOLVERS).
+    sim_kwargs:    extra keyword arguments for simulate() (rtol, atol, ...). Checks are off so unstable runs still report their (inf/nan) error.
+
+    Output:
+    Returns a list of dicts, one per (method, dt), with the error norms, wall time, number of steps and steps per second.
+    """
+    methods = methods or ['euler', 'propagator', 'exact'] + list(SOLVERS)
+    rows = []
+    for method in methods:
+        for dt_s in dt_values:
+            start = time.perf_counter()
+            with np.errstate(over='ignore', invalid='ignore'):
+                t, X, stats = simulate(np.array([A0, 0.0, 0.0]), t_end_s, dt_s, params, checks=False,
+                                       method=method, return_stats=True, **sim_kwargs)
+                elapsed = time.perf_counter() - start
+                row = {'method': method, 'dt_s': dt_s, 'n_steps': stats.n_steps, 'seconds': elapsed,
+                       'steps_per_s': stats.n_steps/elapsed if elapsed > 0 else np.inf}
+                row.update(error_norms(X, analytic_solution(t, A0, params.k1_per_s, params.k2_per_s)))
+            rows.append(row)
+    return rows
@@ -1,7 +1,8 @@
 #!/usr/bin/env python3
 import numpy as np
-import scipy as sp
 import sys
+from scipy.optimize import curve_fit
+from dose_response import sig, hill, sig_jac, hill_jac, initial_guess
 infile = sys.argv[1]
 
 arr = np.loadtxt(infile, dtype=np.float64)
@@ -18,15 +19,11 @@ x_log_arr = np.log10(x_arr)
 m_log, b_log = np.polyfit(x_log_arr, y_arr, 1)
 x_log = 10**((y_mid - b_log) /m_log)
 
-def sig(x, Bottom, Top, LogIC50):
-    return Bottom + ((Top-Bottom)/(1+ (10**(LogIC50-x))))
-popt, pcov = sp.optimize.curve_fit(sig, x_log_arr, y_arr)
+popt, pcov = curve_fit(sig, x_log_arr, y_arr, p0=initial_guess(x_log_arr, y_arr, 'sig'), jac=sig_jac)
 Bottom, Top, LogIC50 = popt
 IC50 = 10**LogIC50
 
-def hill(x, Bottom4, Top4, Hill, LogIC50_4):
-    return Bottom4 + ((Top4-Bottom4)/(1+ (10**(Hill*(LogIC50_4-x))))) 
-popt4, pcov4 = sp.optimize.curve_fit(hill, x_log_arr, y_arr)
+popt4, pcov4 = curve_fit(hill, x_log_arr, y_arr, p0=initial_guess(x_log_arr, y_arr, 'hill'), jac=hill_jac)
 Bottom4, Top4, Hill, LogIC50_4 = popt4
 IC50_4 = 10**LogIC50_4
 
@@ -1,7 +1,8 @@
 #!/usr/bin/env python3
 import numpy as np
-import scipy as sp
 import sys
+from scipy.optimize import curve_fit
+from dose_response import sig, sig_jac, initial_guess
 infile = sys.argv[1]
 
 arr = np.loadtxt(infile, dtype=np.float64)
@@ -18,9 +19,7 @@ x_log_arr = np.log10(x_arr)
 m_log, b_log = np.polyfit(x_log_arr, y_arr, 1)
 x_log = 10**((y_mid - b_log) /m_log)
 
-def sig(x, Bottom, Top, LogIC50):
-    return Bottom + ((Top-Bottom)/(1+ (10**(LogIC50-x))))
-popt, pcov = sp.optimize.curve_fit(sig, x_log_arr, y_arr)
+popt, pcov = curve_fit(sig, x_log_arr, y_arr, p0=initial_guess(x_log_arr, y_arr, 'sig'), jac=sig_jac)
 Bottom, Top, LogIC50 = popt
 IC50 = 10**LogIC50
 print(f'Linear Fit IC50: {x_lin:.2f}\nLogX-Linear Fit IC50: {x_log:.2f}\nSigmoid Fit Fixed Slope IC50: {IC50:.2f}')
\ No newline at end of file
@@ -1,6 +1,5 @@
 #!/usr/bin/env python3
 import numpy as np
-import scipy as sp
 import sys
 infile = sys.argv[1]
 
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+# Start-up cost of each IC50 mode: median wall time of fresh interpreter runs, next to the cost of
+# importing numpy and scipy.optimize alone, so the import share of a per-sample job is visible.
+# Run from hw4/ (it reads phago.txt).
+# usage: ./bench-startup.py [n_repeats]
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+n_repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+py = sys.executable
+
+
+def wall(cmd):
+    start = time.perf_counter()
+    subprocess.run(cmd, stdout=subprocess.DEVNULL, check=True)
+    return time.perf_counter() - start
+
+
+with tempfile.TemporaryDirectory() as plates:
+    for i in range(20):
+        with open('phago.txt') as src, open(os.path.join(plates, f'p{i}.txt'), 'w') as dst:
+            dst.write(src.read())
+
+    modes = [
+        ('interpreter only', [py, '-c', 'pass']),
+        ('import numpy', [py, '-c', 'import numpy']),
+        ('import scipy.optimize', [py, '-c', 'import scipy.optimize']),
+        ('assign-50 (linear)', [py, 'assign-50.py', 'phago.txt']),
+        ('assign-25 (+log-linear)', [py, 'assign-25.py', 'phago.txt']),
+        ('assign-15 (+sig, curve_fit)', [py, 'assign-15.py', 'phago.txt']),
+        ('assign-10 (+hill, curve_fit)', [py, 'assign-10.py', 'phago.txt']),
+        ('ic50 linear,loglinear', [py, 'ic50.py', 'phago.txt', '--models', 'linear,loglinear']),
+        ('ic50 all models', [py, 'ic50.py', 'phago.txt']),
+        ('ic50 all models, 20 files', [py, 'ic50.py', plates, '-j', '1']),
+    ]
+
+    for label, cmd in modes:
+        times = [wall(cmd) for _ in range(n_repeats)]
+        print(f'{label:30s} {1e3*statistics.median(times):8.1f} ms')
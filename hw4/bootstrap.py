@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Bootstrap and jackknife confidence intervals for IC50 and Hill slope.
+
+All resamples of one compound are refitted together as one batch by dose_response.fit_curves, warm-started
+from the full-data fit, so thousands of refits cost a handful of vectorized Levenberg-Marquardt iterations.
+Compounds are spread over a process pool; each compound gets its own generator spawned from one
+SeedSequence(seed), so the intervals depend only on the seed, not on the number of workers.
+
+usage: ./bootstrap.py plate.txt [...] [--model sig|hill] [-n 2000] [--seed S] [--pairs] [-j N]    (prints a TSV table)
+"""
+import sys
+import numpy as np
+
+import dose_response as dr
+
+COLUMNS = ('name', 'model', 'IC50', 'IC50_lo', 'IC50_hi', 'Hill', 'Hill_lo', 'Hill_hi',
+           'LogIC50_se', 'Hill_se', 'LogIC50_jk_se', 'Hill_jk_se', 'n_ok')
+
+
+def _fit_one(x, y, model):
+    P, _, _, _ = dr.fit_curves(x, y[None], model)
+    return P[0]
+
+
+def _hill(P, model):
+    return P[:, 2] if model == 'hill' else np.ones(len(P))
+
+
+def bootstrap(x, y, model='hill', n_boot=2000, rng=None, pairs=False, p_full=None):
+    """
+    Bootstrap refits of one curve.
+
+    Args:
+    x:    log10 concentrations (n_points,).
+    y:    responses (n_points,); NaN points are ignored.
+    model:    'sig' or 'hill'.
+    n_boot:    number of resamples.
+    rng:    np.random.Generator (default a fresh unseeded one).
+    pairs:    resample (x, y) pairs instead of residuals; residual resampling (the default) keeps the
+              dilution series fixed, which suits designed experiments with few points per curve.
+    p_full:    full-data fit to warm-start from (computed if None).
+
+    Output:
+    Returns (P, ok): the refitted parameters (n_boot, n_params) and which refits converged to finite values.
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    keep = np.isfinite(x) & np.isfinite(y)
+    x = x[keep]; y = y[keep]
+    if p_full is None:
+        p_full = _fit_one(x, y, model)
+    idx = rng.integers(0, len(y), size=(n_boot, len(y)))
+    if pairs:
+        Xb = x[idx]; Yb = y[idx]
+    else:
+        fitted = dr.MODELS[model][0](x, *p_full)
+        Xb = x; Yb = fitted + (y - fitted)[idx]
+    P, _, _, converged = dr.fit_curves(Xb, Yb, model, p0=p_full)
+    return P, converged
+
+
+def jackknife(x, y, model='hill', p_full=None):
+    """
+    Leave-one-out refits of one curve, as one batch (each row masks a different point).
+
+    Output:
+    Returns (P, se): the n_points refits and the jackknife standard errors of the parameters.
+    """
+    keep = np.isfinite(x) & np.isfinite(y)
+    x = x[keep]; y = y[keep]
+    if p_full is None:
+        p_full = _fit_one(x, y, model)
+    n = len(y)
+    Yj = np.tile(y, (n, 1))
+    Yj[np.arange(n), np.arange(n)] = np.nan
+    P, _, _, _ = dr.fit_curves(x, Yj, model, p0=p_full)
+    se = np.sqrt((n - 1)/n*np.sum((P - P.mean(axis=0))**2, axis=0))
+    return P, se
+
+
+def _compound(task):
+    x, y, model, n_boot, seed, pairs, level = task
+    p_full = _fit_one(x, y, model)
+    i_log = len(p_full) - 1
+    P, ok = bootstrap(x, y, model, n_boot, np.random.default_rng(seed), pairs, p_full)
+    Pj, se_jk = jackknife(x, y, model, p_full)
+    q = [(1 - level)/2*100, (1 + level)/2*100]
+    log_lo, log_hi = np.percentile(P[ok, i_log], q) if ok.any() else (np.nan, np.nan)
+    h_lo, h_hi = np.percentile(_hill(P[ok], model), q) if ok.any() else (np.nan, np.nan)
+    return (10**p_full[i_log], 10**log_lo, 10**log_hi, _hill(p_full[None], model)[0], h_lo, h_hi,
+            np.std(P[ok, i_log], ddof=1) if ok.sum() > 1 else np.nan,
+            np.std(_hill(P[ok], model), ddof=1) if ok.sum() > 1 else np.nan,
+            se_jk[i_log], se_jk[2] if model == 'hill' else 0.0, int(ok.sum()))
+
+
+def bootstrap_plate(conc, Y, names=None, model='hill', n_boot=2000, seed=None, pairs=False, level=0.95,
+                    n_workers=1):
+    """
+    Percentile bootstrap intervals and jackknife standard errors for every compound of a plate.
+
+    Args:
+    conc:    concentrations, (n_points,) or (n_compounds, n_points).
+    Y:    responses, (n_compounds, n_points).
+    names:    compound names (default their row numbers).
+    model, n_boot, pairs:    see bootstrap().
+    seed:    seed for the SeedSequence the per-compound generators are spawned from.
+    level:    confidence level of the percentile intervals.
+    n_workers:    process pool size over compounds; 1 runs in this process.
+
+    Output:
+    Returns a table as {column: array} with the COLUMNS keys, one row per compound: IC50 and Hill of the
+    full-data fit with their bootstrap interval, bootstrap and jackknife standard errors of LogIC50 and
+    Hill, and the number of converged resamples.
+    """
+    Y = np.atleast_2d(np.asarray(Y, dtype=np.float64))
+    x = np.broadcast_to(np.log10(np.asarray(conc, dtype=np.float64)), Y.shape)
+    names = [str(i) for i in range(len(Y))] if names is None else list(names)
+    seeds = np.random.SeedSequence(seed).spawn(len(Y))
+    tasks = [(x[i], Y[i], model, n_boot, seeds[i], pairs, level) for i in range(len(Y))]
+    if n_workers == 1:
+        rows = [_compound(t) for t in tasks]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=n_workers) as pool:
+            rows = list(pool.map(_compound, tasks, chunksize=max(1, len(tasks)//(4*(n_workers or 4)))))
+    table = {'name': np.array(names, dtype=object), 'model': np.full(len(Y), model, dtype=object)}
+    for j, c in enumerate(COLUMNS[2:]):
+        table[c] = np.array([r[j] for r in rows])
+    return table
+
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    opts = {'--model': 'hill', '-n': '2000', '--seed': None, '-j': '1'}
+    for flag in list(opts):
+        if flag in args:
+            i = args.index(flag); opts[flag] = args[i + 1]; del args[i:i + 2]
+    pairs = '--pairs' in args
+    args = [a for a in args if a != '--pairs']
+    for k, path in enumerate(args):
+        conc, Y, names = dr.load_plate(path)
+        table = bootstrap_plate(conc, Y, names, opts['--model'], int(opts['-n']),
+                                None if opts['--seed'] is None else int(opts['--seed']), pairs,
+                                n_workers=int(opts['-j']))
+        dr.write_table(table, header=(k == 0), columns=COLUMNS)
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Batch dose-response fitting: the fixed-slope (sig) and variable-slope (hill) logistic models of assign-10.py,
+fitted to a whole plate of curves at once.
+
+Levenberg-Marquardt runs vectorized over the batch: each iteration builds every curve's closed-form Jacobian,
+solves all the damped normal equations with one batched np.linalg.solve, and keeps a separate damping factor per
+curve, so a plate of thousands of compounds costs a few dozen NumPy calls per iteration instead of one curve_fit each.
+Missing responses (NaN) are masked out. Large plates are split into chunks, optionally over a process pool.
+
+A plate file is a whitespace table like phago.txt: concentrations in the first column and one response column
+per compound, with an optional '# conc name1 name2 ...' header line.
+
+usage: ./dose_response.py plate.txt [...] [--model sig|hill] [-j N]    (prints a TSV table)
+"""
+import os
+import sys
+import numpy as np
+
+
+def sig(x, Bottom, Top, LogIC50):
+    return Bottom + ((Top-Bottom)/(1+ (10**(LogIC50-x))))
+
+
+def hill(x, Bottom4, Top4, Hill, LogIC50_4):
+    return Bottom4 + ((Top4-Bottom4)/(1+ (10**(Hill*(LogIC50_4-x)))))
+
+
+def _logistic(z):
+    """1/(1 + 10**z) without overflow warnings (0 for large z)."""
+    with np.errstate(over='ignore'):
+        return 1/(1 + 10**z)
+
+
+def hill_jac(x, Bottom4, Top4, Hill, LogIC50_4):
+    """
+    Closed-form d hill/d(Bottom4, Top4, Hill, LogIC50_4), shape x.shape + (4,); usable as curve_fit's jac.
+    With s = 1/(1 + 10**(Hill*(LogIC50_4-x))): dB = 1-s, dT = s, and the Hill and LogIC50 terms are
+    -(Top4-Bottom4)*ln(10)*s*(1-s) times (LogIC50_4-x) and Hill respectively.
+    """
+    s = _logistic(Hill*(LogIC50_4-x))
+    c = -(Top4-Bottom4)*np.log(10)*s*(1-s)
+    return np.stack(np.broadcast_arrays(1-s, s, c*(LogIC50_4-x), c*Hill), axis=-1)
+
+
+def sig_jac(x, Bottom, Top, LogIC50):
+    """Closed-form d sig/d(Bottom, Top, LogIC50): hill_jac with Hill = 1, without the Hill column."""
+    return hill_jac(x, Bottom, Top, 1.0, LogIC50)[..., [0, 1, 3]]
+
+
+# model name -> (function of log10 concentration, its Jacobian, parameter names)
+MODELS = {'sig': (sig, sig_jac, ('Bottom', 'Top', 'LogIC50')),
+          'hill': (hill, hill_jac, ('Bottom', 'Top', 'Hill', 'LogIC50'))}
+
+COLUMNS = ('name', 'model', 'Bottom', 'Top', 'Hill', 'LogIC50', 'IC50', 'sse', 'rmse', 'r2', 'n_iter', 'converged')
+
+
+def _params(P):
+    return tuple(P[:, i, None] for i in range(P.shape[1]))
+
+
+def _residuals(f, x, y, mask, P):
+    with np.errstate(over='ignore'):
+        return np.where(mask, y - f(x, *_params(P)), 0.0)
+
+
+def _polyfit1(x, Y):
+    """Closed-form np.polyfit(x, y, 1) for every row of Y, ignoring NaN points; returns (slopes, intercepts)."""
+    x = np.broadcast_to(x, Y.shape)
+    mask = np.isfinite(x) & np.isfinite(Y)
+    xm = np.where(mask, x, np.nan); ym = np.where(mask, Y, np.nan)
+    dx = xm - np.nanmean(xm, axis=1, keepdims=True)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        m = np.nansum(dx*ym, axis=1)/np.nansum(dx**2, axis=1)
+    return m, np.nanmean(ym, axis=1) - m*np.nanmean(xm, axis=1)
+
+
+def linear_ic50(x, Y):
+    """
+    The straight-line estimate of assign-25.py for every curve: where the least-squares line through (x, y)
+    crosses y_mid = (min + max)/2. Pass concentrations for the linear fit, log10 concentrations for the
+    log-linear one (then the IC50 is 10**result).
+    """
+    Y = np.atleast_2d(Y)
+    m, b = _polyfit1(x, Y)
+    y_mid = (np.nanmin(Y, axis=1) + np.nanmax(Y, axis=1))/2
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return (y_mid - b)/m
+
+
+def initial_guess(x, Y, model='hill'):
+    """
+    Data-driven starting values for every curve (x = log10 concentration, NaN responses ignored).
+    Bottom and Top are the response extremes, ordered so Bottom is the end seen at low concentration (the
+    sign convention curve_fit lands on: Hill > 0, Top < Bottom for inhibition); LogIC50 is where the
+    log-linear least-squares line crosses y_mid = (min + max)/2, clipped to the tested range; Hill = 1.
+    A 1-D Y (one curve) gives a 1-D result, ready for curve_fit's p0.
+    """
+    one = np.ndim(Y) == 1
+    Y = np.atleast_2d(np.asarray(Y, dtype=np.float64))
+    x = np.broadcast_to(x, Y.shape)
+    mask = np.isfinite(x) & np.isfinite(Y)
+    xm = np.where(mask, x, np.nan); ym = np.where(mask, Y, np.nan)
+    y_min = np.nanmin(ym, axis=1); y_max = np.nanmax(ym, axis=1)
+    m_log = _polyfit1(xm, ym)[0]
+    log_ic50 = linear_ic50(xm, ym)
+    log_ic50 = np.clip(np.where(np.isfinite(log_ic50), log_ic50, np.nanmean(xm, axis=1)),
+                       np.nanmin(xm, axis=1), np.nanmax(xm, axis=1))
+    rising = m_log >= 0
+    bottom = np.where(rising, y_min, y_max); top = np.where(rising, y_max, y_min)
+    if model == 'sig':
+        P = np.column_stack([bottom, top, log_ic50])
+    else:
+        P = np.column_stack([bottom, top, np.ones(len(Y)), log_ic50])
+    return P[0] if one else P
+
+
+def fit_curves(x, Y, model='hill', p0=None, max_iter=200, ftol=1e-12, xtol=1e-12):
+    """
+    Least-squares fit of one model to many curves with a vectorized Levenberg-Marquardt.
+
+    Args:
+    x:    log10 concentrations, shape (n_points,) shared by all curves or (n_curves, n_points).
+    Y:    responses, shape (n_curves, n_points); NaN marks a missing point.
+    model:    'sig' (3 parameters, slope fixed at 1) or 'hill' (4 parameters).
+    p0:    starting parameters (n_params,) or (n_curves, n_params); default initial_guess().
+    max_iter, ftol, xtol:    a curve stops when an accepted step lowers its SSE by less than ftol (relative)
+                             or changes its parameters by less than xtol (relative).
+
+    Output:
+    Returns (P, sse, n_iter, converged): parameters (n_curves, n_params) in MODELS order, residual sum of
+    squares, iterations used and whether the tolerance was reached (False for a curve with non-finite
+    parameters or fewer observed points than parameters).
+    """
+    f, jac, names = MODELS[model]
+    Y = np.atleast_2d(np.asarray(Y, dtype=np.float64))
+    x = np.broadcast_to(np.asarray(x, dtype=np.float64), Y.shape)
+    mask = np.isfinite(x) & np.isfinite(Y)
+    x = np.where(mask, x, 0.0); y = np.where(mask, Y, 0.0)
+    n_c, n_p = len(Y), len(names)
+    P = initial_guess(np.where(mask, x, np.nan), Y, model) if p0 is None \
+        else np.array(np.broadcast_to(p0, (n_c, n_p)), dtype=np.float64)
+
+    r = _residuals(f, x, y, mask, P)
+    sse = np.sum(r**2, axis=1)
+    lam = np.full(n_c, 1e-3)
+    n_iter = np.zeros(n_c, dtype=int)
+    converged = np.zeros(n_c, dtype=bool)
+    # a curve with fewer observed points than parameters (e.g. all NaN) has no determined fit and is never converged
+    fittable = (mask.sum(axis=1) >= n_p) & np.all(np.isfinite(P), axis=1) & np.isfinite(sse)
+    active = np.flatnonzero(fittable)
+    for _ in range(max_iter):
+        if active.size == 0:
+            break
+        xa, ya, ma, Pa = x[active], y[active], mask[active], P[active]
+        J = np.where(ma[:, :, None], jac(xa, *_params(Pa)), 0.0)
+        A = np.einsum('cki,ckj->cij', J, J)
+        g = np.einsum('cki,ck->ci', J, r[active])
+        d = np.einsum('cii->ci', A)
+        A[:, np.arange(n_p), np.arange(n_p)] += lam[active, None]*np.maximum(d, 1e-12*(d.max(axis=1, keepdims=True) + 1e-300))
+        step = np.linalg.solve(A, g[:, :, None])[:, :, 0]
+        P_new = Pa + step
+        r_new = _residuals(f, xa, ya, ma, P_new)
+        sse_new = np.sum(r_new**2, axis=1)
+        better = sse_new < sse[active]
+        done = better & ((sse[active] - sse_new <= ftol*sse[active])
+                         | (np.linalg.norm(step, axis=1) <= xtol*(np.linalg.norm(Pa, axis=1) + xtol)))
+        keep = active[better]
+        P[keep] = P_new[better]; r[keep] = r_new[better]; sse[keep] = sse_new[better]
+        lam[active] = np.clip(np.where(better, lam[active]/10, lam[active]*10), 1e-12, 1e12)
+        n_iter[active] += 1
+        # a curve whose damping is at the ceiling cannot find a downhill step any more
+        stuck = ~better & (lam[active] >= 1e12)
+        converged[active[done | stuck]] = True
+        active = active[~(done | stuck)]
+    converged &= fittable & np.all(np.isfinite(P), axis=1)
+    return P, sse, n_iter, converged
+
+
+def load_plate(path):
+    """
+    Read a plate file; returns (conc, Y, names) with Y of shape (n_compounds, n_concentrations).
+    Compounds without a header name are called <file>:<column>, or just <file> for a single-compound file.
+    """
+    with open(path) as f:
+        first = f.readline()
+    arr = np.loadtxt(path, dtype=np.float64, ndmin=2)
+    conc = arr[:, 0]; Y = arr[:, 1:].T
+    stem = os.path.basename(path)
+    if first.startswith('#') and len(first.lstrip('#').split()) == arr.shape[1]:
+        names = first.lstrip('#').split()[1:]
+    elif len(Y) == 1:
+        names = [stem]
+    else:
+        names = [f'{stem}:{j + 1}' for j in range(len(Y))]
+    return conc, Y, names
+
+
+def _fit_chunk(task):
+    x, Y, model = task
+    return fit_curves(x, Y, model)
+
+
+def fit_plate(conc, Y, names=None, models=('sig', 'hill'), chunk_size=4096, n_workers=1):
+    """
+    Fit every model to every curve of a plate.
+
+    Args:
+    conc:    concentrations, (n_points,) or (n_curves, n_points).
+    Y:    responses, (n_curves, n_points).
+    names:    compound names (default their row numbers).
+    models:    names in MODELS.
+    chunk_size:    curves per vectorized batch (bounds memory).
+    n_workers:    process pool size for the chunks; 1 fits in this process.
+
+    Output:
+    Returns a table as {column: array} with the COLUMNS keys and one row per (model, compound).
+    Hill is 1 for the fixed-slope model; rmse uses n_points - n_params degrees of freedom.
+    """
+    Y = np.atleast_2d(np.asarray(Y, dtype=np.float64))
+    x = np.broadcast_to(np.log10(np.asarray(conc, dtype=np.float64)), Y.shape)
+    names = [str(i) for i in range(len(Y))] if names is None else list(names)
+    starts = range(0, len(Y), chunk_size)
+    tasks = [(x[i:i + chunk_size], Y[i:i + chunk_size], m) for m in models for i in starts]
+    if n_workers == 1:
+        results = [_fit_chunk(t) for t in tasks]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=n_workers) as pool:
+            results = list(pool.map(_fit_chunk, tasks))
+
+    n_obs = np.sum(np.isfinite(Y) & np.isfinite(x), axis=1)
+    sst = np.nansum((Y - np.nanmean(Y, axis=1, keepdims=True))**2, axis=1)
+    table = {c: [] for c in COLUMNS}
+    for k, m in enumerate(models):
+        chunks = results[k*len(starts):(k + 1)*len(starts)]
+        P = np.concatenate([c[0] for c in chunks])
+        sse = np.concatenate([c[1] for c in chunks])
+        params = dict(zip(MODELS[m][2], P.T))
+        table['name'].append(np.array(names, dtype=object))
+        table['model'].append(np.full(len(Y), m, dtype=object))
+        table['Bottom'].append(params['Bottom']); table['Top'].append(params['Top'])
+        table['Hill'].append(params.get('Hill', np.ones(len(Y))))
+        table['LogIC50'].append(params['LogIC50']); table['IC50'].append(10**params['LogIC50'])
+        table['sse'].append(sse)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            table['rmse'].append(np.sqrt(sse/(n_obs - P.shape[1])))
+            table['r2'].append(1 - sse/sst)
+        table['n_iter'].append(np.concatenate([c[2] for c in chunks]))
+        table['converged'].append(np.concatenate([c[3] for c in chunks]))
+    return {c: np.concatenate(v) for c, v in table.items()}
+
+
+def _fmt(v):
+    return f'{v:.6g}' if isinstance(v, (float, np.floating)) else str(v)
+
+
+def write_table(table, out=sys.stdout, header=True, columns=COLUMNS):
+    """Write a fit_plate() table (or any {column: array} table with the given columns) as TSV."""
+    if header:
+        out.write('\t'.join(columns) + '\n')
+    for i in range(len(table[columns[0]])):
+        out.write('\t'.join(_fmt(table[c][i]) for c in columns) + '\n')
+
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    models = ('sig', 'hill')
+    n_workers = 1
+    if '--model' in args:
+        i = args.index('--model'); models = (args[i + 1],); del args[i:i + 2]
+    if '-j' in args:
+        i = args.index('-j'); n_workers = int(args[i + 1]); del args[i:i + 2]
+    for k, path in enumerate(args):
+        conc, Y, names = load_plate(path)
+        write_table(fit_plate(conc, Y, names, models, n_workers=n_workers), header=(k == 0))
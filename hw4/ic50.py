@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+One IC50 pipeline for many input files: the linear and log-linear estimates of assign-25/50.py and the
+fixed-slope (sig) and 4PL (hill) fits of assign-10/15.py, for every compound of every file.
+
+Inputs may be files, glob patterns or directories (every *.txt inside); each is read as a plate with
+dose_response.load_plate, so one-compound files like phago.txt work as they are. Files are processed
+concurrently over a process pool and every file's rows are written as soon as it is done (in input order),
+as TSV or JSON lines, so the interpreter and library start-up is paid once per batch.
+Only NumPy is loaded up front: the nonlinear fits use dose_response's own Levenberg-Marquardt, so SciPy is
+never imported, and the process pool machinery is imported only when there is more than one file.
+
+usage: ./ic50.py phago.txt 'plates/*.txt' plates/ [--models linear,loglinear,sig,hill] [--json] [-j N]
+"""
+import argparse
+import glob
+import json
+import math
+import os
+import sys
+import numpy as np
+
+import dose_response as dr
+
+ESTIMATORS = ('linear', 'loglinear', 'sig', 'hill')
+COLUMNS = ('file', 'name', 'model', 'IC50', 'Hill', 'r2')
+
+
+def expand_inputs(patterns):
+    """Files named by patterns: plain paths, glob patterns, or directories (their *.txt files, sorted)."""
+    paths = []
+    for p in patterns:
+        if os.path.isdir(p):
+            paths += sorted(glob.glob(os.path.join(p, '*.txt')))
+        elif glob.has_magic(p):
+            paths += sorted(glob.glob(p))
+        else:
+            paths.append(p)
+    return paths
+
+
+def estimate(conc, Y, names, models=ESTIMATORS):
+    """
+    Every requested estimate for every compound of one plate.
+
+    Output:
+    Returns a list of row dicts with the COLUMNS keys except 'file'; Hill and r2 are None for the
+    straight-line estimates.
+    """
+    Y = np.atleast_2d(Y)
+    rows = []
+    for m in models:
+        if m == 'linear':
+            ic50 = dr.linear_ic50(conc, Y)
+            rows += [{'name': n, 'model': m, 'IC50': v, 'Hill': None, 'r2': None} for n, v in zip(names, ic50)]
+        elif m == 'loglinear':
+            ic50 = 10**dr.linear_ic50(np.log10(conc), Y)
+            rows += [{'name': n, 'model': m, 'IC50': v, 'Hill': None, 'r2': None} for n, v in zip(names, ic50)]
+        elif m in dr.MODELS:
+            t = dr.fit_plate(conc, Y, names, models=(m,))
+            rows += [{'name': t['name'][i], 'model': m, 'IC50': t['IC50'][i], 'Hill': t['Hill'][i],
+                      'r2': t['r2'][i]} for i in range(len(t['name']))]
+        else:
+            raise ValueError(f'unknown model {m!r}; choose from {", ".join(ESTIMATORS)}')
+    return rows
+
+
+def _run_file(task):
+    path, models = task
+    conc, Y, names = dr.load_plate(path)
+    return [{'file': path, **row} for row in estimate(conc, Y, names, models)]
+
+
+def _plain(v):
+    """Row value as a plain Python value; non-finite floats become None (JSON has no NaN)."""
+    if isinstance(v, (np.floating, float)):
+        v = float(v)
+        return v if math.isfinite(v) else None
+    return v.item() if isinstance(v, np.generic) else v
+
+
+def write_rows(rows, out, as_json):
+    for row in rows:
+        if as_json:
+            out.write(json.dumps({c: _plain(row[c]) for c in COLUMNS}) + '\n')
+        else:
+            values = (_plain(row[c]) for c in COLUMNS)
+            out.write('\t'.join('' if v is None else f'{v:.6g}' if isinstance(v, float) else str(v)
+                                 for v in values) + '\n')
+    out.flush()
+
+
+def run(paths, models=ESTIMATORS, out=sys.stdout, as_json=False, n_workers=None):
+    """Estimate every file and stream the rows to out, one file at a time in input order."""
+    if not as_json:
+        out.write('\t'.join(COLUMNS) + '\n')
+    tasks = [(p, tuple(models)) for p in paths]
+    if n_workers == 1 or len(tasks) <= 1:
+        for t in tasks:
+            write_rows(_run_file(t), out, as_json)
+        return
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=n_workers) as pool:
+        for rows in pool.map(_run_file, tasks):
+            write_rows(rows, out, as_json)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Estimate IC50s for many dose-response files.')
+    parser.add_argument('inputs', nargs='+', help='files, glob patterns or directories')
+    parser.add_argument('--models', default=','.join(ESTIMATORS), help='comma-separated subset of ' + ','.join(ESTIMATORS))
+    parser.add_argument('--json', action='store_true', help='write JSON lines instead of TSV')
+    parser.add_argument('-j', '--jobs', type=int, default=None, help='files processed concurrently')
+    args = parser.parse_args()
+    run(expand_inputs(args.inputs), args.models.split(','), as_json=args.json, n_workers=args.jobs)
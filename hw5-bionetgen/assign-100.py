@@ -1,8 +1,8 @@
 #!/usr/bin/env python3
 
-import subprocess
-import pandas as pd
 import os
+import net_cache
+import net_model
 
 # BNGL model text
 bngl_model = """begin model
@@ -131,20 +131,11 @@ generate_network({overwrite=>1})
 simulate_ode({t_end=>600, n_steps=>49})
 """
 
-# Write BNGL file
-with open("assign-100.bngl", "w") as f:
-    f.write(bngl_model)
-
-# Run BNGL with BioNetGen
-subprocess.run(["bionetgen", "run", "-i", "assign-100.bngl"], 
-               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, 
-               check=True)
-
-# Load simulation results
-res = pd.read_csv("assign-100.gdat", sep=r'\s+', comment="#", header=None)
-
-# Assign correct column names
-res.columns = ['time', 'NAD', 'LAC', 'PYR', 'PEP', 'PG2', 'PG3']
+# Network generation is cached on the model block, so BioNetGen only runs when
+# the model changes; the ODEs are then simulated in-process from the cached .net
+# over the t_end/n_steps of the simulate_ode action above
+net = net_cache.cached_network(bngl_model)
+res = net_model.simulate_ode(net, **net_cache.ode_action(bngl_model))
 
 # Observables of interest
 onames= ['NAD','LAC','PYR', 'PEP', 'PG2', 'PG3']
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Fast readers for BioNetGen .gdat/.cdat output, with an optional binary columnar copy.
+
+Column names come from the '#' header line, so scripts no longer hard-code them. The numbers are parsed in one
+pass by viewing BioNetGen's fixed-width rows as byte-string fields (falling back to one whitespace split)
+instead of pandas' general CSV parser. to_columns() stores each column as its own .npy file in <file>.cols/, and read_gdat()
+memory-maps that copy on later reads instead of parsing the text again.
+
+usage: ./gdat_io.py file.gdat [...]    (writes <file>.cols/ for each file)
+"""
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+
+def header(path):
+    """Column names from the '#' header line of a .gdat/.cdat file."""
+    with open(path) as f:
+        first = f.readline()
+    if not first.startswith('#'):
+        raise ValueError(f'{path}: no # header line')
+    return first.lstrip('#').split()
+
+
+def _parse_fixed(raw, n_cols):
+    """
+    Fixed-layout fast path for files written by BioNetGen: every row is n_cols fields of the same width
+    (' %19.12e', minus the leading space of the first field). The rows are viewed as one (n_rows, n_cols)
+    array of fixed-width byte strings and converted to float in a single call, without tokenizing.
+    Returns None when the text does not have that layout.
+    """
+    width = raw.find(b'\n') + 1
+    if width <= 0 or len(raw) % width or b'\r' in raw[:width] or width % n_cols:
+        return None
+    rows = np.frombuffer(raw, dtype=np.uint8).reshape(-1, width)
+    if np.any(rows[:, -1] != ord('\n')):
+        return None
+    # shift each row right by one byte so the first field gets its missing leading space
+    fields = np.full(rows.shape, ord(' '), dtype=np.uint8)
+    fields[:, 1:] = rows[:, :-1]
+    try:
+        return fields.view(f'S{width//n_cols}').astype(np.float64)
+    except ValueError:
+        return None
+
+
+def parse(path):
+    """
+    Parse a .gdat/.cdat text file, using the fixed-layout path when the file has BioNetGen's layout
+    and a single whitespace-split pass otherwise.
+
+    Output:
+    Returns (names, data) with data a float array of shape (n_rows, len(names)).
+    """
+    with open(path, 'rb') as f:
+        names = f.readline().decode().lstrip('#').split()
+        raw = f.read()
+    data = _parse_fixed(raw, len(names))
+    if data is None:
+        data = np.fromstring(raw, dtype=np.float64, sep=' ')
+        if data.size % len(names):
+            raise ValueError(f'{path}: {data.size} values do not fill {len(names)} columns')
+        data = data.reshape(-1, len(names))
+    return names, data
+
+
+def _cols_dir(path):
+    return path + '.cols'
+
+
+def to_columns(path):
+    """Write the binary columnar copy <path>.cols/ (one .npy per column, plus _columns.txt with their order)."""
+    names, data = parse(path)
+    out = _cols_dir(path)
+    os.makedirs(out, exist_ok=True)
+    for j, name in enumerate(names):
+        np.save(os.path.join(out, name + '.npy'), np.ascontiguousarray(data[:, j]))
+    # written last, so a half-written directory is never taken as up to date
+    with open(os.path.join(out, '_columns.txt'), 'w') as f:
+        f.write('\n'.join(names) + '\n')
+    return out
+
+
+def load_columns(path):
+    """
+    Memory-map the columnar copy of path; returns {column name: read-only array} in file order, or None if
+    the copy is missing or older than the text file.
+    """
+    out = _cols_dir(path)
+    index = os.path.join(out, '_columns.txt')
+    if not os.path.exists(index) or os.path.getmtime(index) < os.path.getmtime(path):
+        return None
+    with open(index) as f:
+        names = f.read().split()
+    return {name: np.load(os.path.join(out, name + '.npy'), mmap_mode='r') for name in names}
+
+
+def read_gdat(path, columnar=False):
+    """
+    Read a .gdat or .cdat file into a DataFrame with the column names from its header.
+
+    Args:
+    path:    .gdat/.cdat file.
+    columnar:    use (and create, if missing or stale) the binary columnar copy, so repeated reads skip text parsing.
+    """
+    if columnar:
+        cols = load_columns(path)
+        if cols is None:
+            to_columns(path)
+            cols = load_columns(path)
+        return pd.DataFrame(cols)
+    names, data = parse(path)
+    return pd.DataFrame(data, columns=names)
+
+
+if __name__ == '__main__':
+    for p in sys.argv[1:]:
+        print(to_columns(p))
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Content-addressed cache of BioNetGen-generated networks.
+
+The key is a SHA-256 of the model block (begin model ... end model) with trailing whitespace and blank lines
+removed, so the actions after 'end model' and cosmetic edits do not force a regeneration. Each entry is one
+<hash>.net file; entries are touched on use and the least recently used ones are deleted once the cache grows
+past max_entries or max_bytes.
+
+ode_action() reads t_end/n_steps from the simulate_ode action, so scripts can run the cached network with
+net_model.simulate_ode(path, **ode_action(text)).
+
+usage: ./net_cache.py model.bngl    (prints the path of the cached .net)
+"""
+import hashlib
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+
+DEFAULT_DIR = os.environ.get('BNG_NET_CACHE', os.path.expanduser('~/.cache/bngl-networks'))
+
+
+def model_block(bngl_text):
+    """The 'begin model' ... 'end model' part of a BNGL file, normalized for hashing."""
+    start = bngl_text.find('begin model')
+    end = bngl_text.find('end model')
+    if start < 0 or end < 0:
+        raise ValueError('BNGL text has no begin model / end model block')
+    lines = [l.rstrip() for l in bngl_text[start:end + len('end model')].splitlines()]
+    return '\n'.join(l for l in lines if l) + '\n'
+
+
+def model_hash(bngl_text):
+    return hashlib.sha256(model_block(bngl_text).encode()).hexdigest()
+
+
+def ode_action(bngl_text):
+    """
+    Arguments of the simulate_ode({...}) action after the model block, as keyword arguments for
+    net_model.simulate_ode (t_end, n_steps and t_start when given).
+    """
+    m = re.search(r'simulate_ode\s*\(\s*\{(.*?)\}\s*\)', bngl_text[bngl_text.find('end model'):], re.S)
+    if m is None:
+        raise ValueError('BNGL text has no simulate_ode action after the model block')
+    args = dict(re.findall(r'(\w+)\s*=>\s*([^,\s}]+)', m.group(1)))
+    out = {}
+    for name, kind in (('t_start', float), ('t_end', float), ('n_steps', int)):
+        if name in args:
+            out[name] = kind(float(args[name]))
+    if 't_end' not in out:
+        raise ValueError('simulate_ode action has no t_end')
+    out.setdefault('n_steps', 1)
+    return out
+
+
+def _generate(block, dest):
+    """Run BioNetGen's generate_network on the model block in a scratch directory and move the .net to dest."""
+    with tempfile.TemporaryDirectory() as tmp:
+        with open(os.path.join(tmp, 'model.bngl'), 'w') as f:
+            f.write(block + '\ngenerate_network({overwrite=>1})\n')
+        subprocess.run(['bionetgen', 'run', '-i', 'model.bngl', '-o', tmp], cwd=tmp,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        net = os.path.join(tmp, 'model.net')
+        # copy next to dest first so the final rename is atomic even across filesystems
+        partial = dest + f'.{os.getpid()}.tmp'
+        shutil.copyfile(net, partial)
+        os.replace(partial, dest)
+
+
+def evict(cache_dir=DEFAULT_DIR, max_entries=64, max_bytes=256*2**20, keep=None):
+    """
+    Delete least recently used .net entries until both limits hold. The entry named keep is never deleted (it
+    still counts towards the limits), so a network larger than max_bytes survives the eviction after it was written.
+    """
+    entries = []
+    for name in os.listdir(cache_dir):
+        if name.endswith('.net'):
+            st = os.stat(os.path.join(cache_dir, name))
+            entries.append((st.st_mtime, st.st_size, name))
+    # oldest first, with keep moved to the end so it is never reached
+    entries.sort(key=lambda e: (e[2] == keep, e[0]))
+    total = sum(size for _, size, _ in entries)
+    while entries and entries[0][2] != keep and (len(entries) > max_entries or total > max_bytes):
+        _, size, name = entries.pop(0)
+        os.remove(os.path.join(cache_dir, name))
+        total -= size
+
+
+def cached_network(bngl_text, cache_dir=DEFAULT_DIR, max_entries=64, max_bytes=256*2**20):
+    """
+    Path of the .net file for this model, generating it with BioNetGen only on a cache miss.
+
+    Args:
+    bngl_text:    full BNGL text; only the model block is used.
+    cache_dir:    cache location (default $BNG_NET_CACHE or ~/.cache/bngl-networks).
+    max_entries, max_bytes:    LRU limits applied after each miss.
+
+    Output:
+    Returns the path of the cached .net, ready for net_model.load_net / simulate_ode.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    block = model_block(bngl_text)
+    path = os.path.join(cache_dir, hashlib.sha256(block.encode()).hexdigest() + '.net')
+    if os.path.exists(path):
+        os.utime(path)
+        return path
+    _generate(block, path)
+    evict(cache_dir, max_entries, max_bytes, keep=os.path.basename(path))
+    return path
+
+
+if __name__ == '__main__':
+    with open(sys.argv[1]) as f:
+        print(cached_network(f.read()))
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Parameter scans over a BNGL model with a bounded worker pool.
+
+The network is generated once (through net_cache), then every parameter set is simulated concurrently:
+in-process with net_model over a process pool (default), or with BioNetGen itself over a thread pool,
+each run in its own temporary directory so the fixed <model>.gdat output names never collide.
+All runs are merged into one table with one row per (parameter set, time point).
+
+usage: ./net_scan.py model.bngl t_end n_steps kf=1e-5,2e-5 kcat=0.1,0.2 [-j 4] [--bionetgen] [-o scan.csv]
+"""
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import argparse
+import itertools
+import os
+import subprocess
+import tempfile
+import pandas as pd
+
+import gdat_io
+import net_cache
+import net_model
+
+
+def parameter_grid(ranges):
+    """Every combination of the values in ranges ({name: [values]}), as a list of {name: value} dicts."""
+    names = list(ranges)
+    return [dict(zip(names, combo)) for combo in itertools.product(*(ranges[n] for n in names))]
+
+
+def _run_inprocess(task):
+    net_path, t_end, n_steps, overrides = task
+    return net_model.simulate_ode(net_path, t_end, n_steps, **overrides)
+
+
+def _run_bionetgen(task):
+    """Simulate one parameter set with BioNetGen in a private temporary directory."""
+    net_path, t_end, n_steps, overrides = task
+    with tempfile.TemporaryDirectory() as tmp:
+        lines = [f'readFile({{file=>"{os.path.abspath(net_path)}"}})']
+        lines += [f'setParameter("{name}", {value})' for name, value in overrides.items()]
+        lines.append(f'simulate_ode({{prefix=>"scan", t_end=>{t_end}, n_steps=>{n_steps}}})')
+        with open(os.path.join(tmp, 'scan.bngl'), 'w') as f:
+            f.write('\n'.join(lines) + '\n')
+        subprocess.run(['bionetgen', 'run', '-i', 'scan.bngl', '-o', tmp], cwd=tmp,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        return gdat_io.read_gdat(os.path.join(tmp, 'scan.gdat'))
+
+
+def scan(bngl_text, t_end, n_steps, parameter_sets, n_workers=None, bionetgen=False):
+    """
+    Simulate every parameter set and merge the results.
+
+    Args:
+    bngl_text:    BNGL model text (only the model block matters; the network is generated once and cached).
+    t_end, n_steps:    simulate_ode output grid.
+    parameter_sets:    list of {parameter name: value} dicts, e.g. from parameter_grid().
+    n_workers:    pool size (default os.cpu_count()).
+    bionetgen:    run each set through BioNetGen instead of the in-process simulator.
+
+    Output:
+    Returns a DataFrame with columns set (index into parameter_sets), the scanned parameters, time and one column per observable.
+    Raises KeyError before any run starts if a parameter set names a parameter the model does not have.
+    """
+    net_path = net_cache.cached_network(bngl_text)
+    known = net_model.load_net(net_path).parameters
+    unknown = sorted({name for overrides in parameter_sets for name in overrides} - set(known))
+    if unknown:
+        raise KeyError(f'unknown parameter(s): {", ".join(unknown)}')
+    tasks = [(net_path, t_end, n_steps, overrides) for overrides in parameter_sets]
+    pool = ThreadPoolExecutor if bionetgen else ProcessPoolExecutor
+    with pool(max_workers=n_workers) as ex:
+        results = list(ex.map(_run_bionetgen if bionetgen else _run_inprocess, tasks))
+    frames = []
+    for i, (overrides, res) in enumerate(zip(parameter_sets, results)):
+        front = pd.DataFrame({'set': i, **overrides}, index=res.index)
+        frames.append(pd.concat([front, res], axis=1))
+    return pd.concat(frames, ignore_index=True)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Scan BNGL model parameters over a worker pool.')
+    parser.add_argument('bngl')
+    parser.add_argument('t_end', type=float)
+    parser.add_argument('n_steps', type=int)
+    parser.add_argument('ranges', nargs='+', help='name=v1,v2,...')
+    parser.add_argument('-j', '--jobs', type=int, default=None)
+    parser.add_argument('--bionetgen', action='store_true', help='simulate with BioNetGen instead of in-process')
+    parser.add_argument('-o', '--output', default=None, help='write CSV here instead of stdout')
+    args = parser.parse_args()
+
+    ranges = {}
+    for item in args.ranges:
+        name, values = item.split('=', 1)
+        ranges[name] = [float(v) for v in values.split(',')]
+    with open(args.bngl) as f:
+        bngl_text = f.read()
+    try:
+        table = scan(bngl_text, args.t_end, args.n_steps, parameter_grid(ranges),
+                     n_workers=args.jobs, bionetgen=args.bionetgen)
+    except KeyError as e:
+        parser.error(e.args[0])
+    if args.output:
+        table.to_csv(args.output, index=False)
+    else:
+        print(table.to_string(index=False))
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+In-process stochastic simulation (Gillespie SSA, optionally tau-leaping) of networks loaded from .net files.
+
+Many replicates run per call, chunked over a process pool. Every replicate draws from its own generator,
+spawned from one SeedSequence(seed), so results depend only on the seed and the replicate index, not on the
+number of workers.
+
+usage: ./net_ssa.py model.net t_end n_steps n_replicates [seed] [--tau]
+"""
+from concurrent.futures import ProcessPoolExecutor
+import sys
+import numpy as np
+
+import net_model
+
+
+class SSANet:
+    """
+    Arrays for stochastic simulation of a compiled .net model.
+
+    Propensities use copy numbers: a_j = k_j * prod over reactant slots of (x_i - m), where m counts earlier
+    slots of the same species (x*(x-1) for A + A; BioNetGen already puts the 1/2 into k_j).
+    deps[j] lists the reactions whose propensity changes when reaction j fires (those with a reactant whose
+    count j changes), so after an event only those are recomputed.
+    """
+
+    def __init__(self, net):
+        self.net = net
+        self.k = net.k
+        self.reactant_index = net.reactant_index
+        n_r, order = net.reactant_index.shape
+        n_s = len(net.species)
+        self.offset = np.zeros((n_r, order))
+        for j in range(n_r):
+            for slot in range(order):
+                c = net.reactant_index[j, slot]
+                if c < n_s:
+                    self.offset[j, slot] = np.sum(net.reactant_index[j, :slot] == c)
+        S = net.S.tocsc()
+        self.S = net.S
+        self.S2 = net.S.multiply(net.S).tocsr()
+        self.change_idx = [S.indices[S.indptr[j]:S.indptr[j+1]] for j in range(n_r)]
+        self.change_val = [S.data[S.indptr[j]:S.indptr[j+1]] for j in range(n_r)]
+        uses = [set() for _ in range(n_s + 1)]
+        for j in range(n_r):
+            for c in net.reactant_index[j]:
+                uses[c].add(j)
+        self.deps = [np.array(sorted(set().union(*(uses[i] for i in self.change_idx[j]))), dtype=np.intp)
+                     for j in range(n_r)]
+        self.xpad = np.ones(n_s + 1)
+
+    def propensities(self, x, which=None):
+        self.xpad[:-1] = x
+        R = self.reactant_index if which is None else self.reactant_index[which]
+        off = self.offset if which is None else self.offset[which]
+        k = self.k if which is None else self.k[which]
+        return k*np.prod(np.maximum(self.xpad[R] - off, 0.0), axis=1)
+
+
+def _direct(ssa, x, rng, t_out):
+    """Gillespie direct method with dependency-graph propensity updates; returns the states at t_out."""
+    X = np.empty((len(t_out), len(x)))
+    a = ssa.propensities(x)
+    t = 0.0; i_out = 0
+    while i_out < len(t_out):
+        a0 = a.sum()
+        t_next = t + rng.exponential(1/a0) if a0 > 0 else np.inf
+        while i_out < len(t_out) and t_out[i_out] < t_next:
+            X[i_out] = x; i_out += 1
+        if i_out == len(t_out):
+            break
+        j = min(np.searchsorted(np.cumsum(a), rng.random()*a0, side='right'), len(a) - 1)
+        x[ssa.change_idx[j]] += ssa.change_val[j]
+        a[ssa.deps[j]] = ssa.propensities(x, ssa.deps[j])
+        t = t_next
+    return X
+
+
+def _tau_leap(ssa, x, rng, t_out, eps=0.03):
+    """
+    Tau-leaping with the Cao-Gillespie-Petzold step size (relative change of each species bounded by eps).
+    Leaps never cross an output time; a leap that would make a count negative is retried with half the step,
+    and when the step is under ~10 expected events a single exact SSA event is taken instead.
+    """
+    X = np.empty((len(t_out), len(x)))
+    X[0] = x
+    t = t_out[0]; i_out = 1
+    while i_out < len(t_out):
+        a = ssa.propensities(x)
+        a0 = a.sum()
+        if a0 <= 0:
+            X[i_out:] = x
+            break
+        mu = ssa.S @ a
+        var = ssa.S2 @ a
+        bound = np.maximum(eps*x, 1.0)
+        with np.errstate(divide='ignore'):
+            tau = min(np.min(bound/np.abs(mu)), np.min(bound**2/var))
+        tau = min(tau, t_out[i_out] - t)
+        if tau*a0 < 10:
+            dt = rng.exponential(1/a0)
+            if t + dt < t_out[i_out]:
+                j = min(np.searchsorted(np.cumsum(a), rng.random()*a0, side='right'), len(a) - 1)
+                x[ssa.change_idx[j]] += ssa.change_val[j]
+                t += dt
+                continue
+            tau = t_out[i_out] - t
+        else:
+            while True:
+                fired = rng.poisson(a*tau)
+                x_new = x + ssa.S @ fired
+                if np.all(x_new >= 0):
+                    break
+                tau /= 2
+            x = x_new
+        t += tau
+        if t >= t_out[i_out]:
+            X[i_out] = x; i_out += 1
+    return X
+
+
+def _run_replicates(task):
+    model, overrides, t_out, seeds, method, eps = task
+    ssa = SSANet(model.compile(**overrides))
+    x0 = np.round(ssa.net.x0)
+    runner = _tau_leap if method == 'tau' else _direct
+    return np.stack([runner(ssa, x0.copy(), np.random.default_rng(s), t_out, *((eps,) if method == 'tau' else ()))
+                     for s in seeds])
+
+
+def simulate_ssa(model, t_end, n_steps, n_replicates=1, seed=None, method='direct', eps=0.03,
+                 n_workers=1, chunk_size=16, species=False, **overrides):
+    """
+    Stochastic simulation of a .net model, like BioNetGen's simulate_ssa but with many replicates per call.
+
+    Args:
+    model:    NetModel from net_model.load_net(), or a path to a .net file.
+    t_end, n_steps:    output grid np.linspace(0, t_end, n_steps+1).
+    n_replicates:    number of independent trajectories.
+    seed:    seed for the SeedSequence the per-replicate generators are spawned from.
+    method:    'direct' (exact Gillespie SSA) or 'tau' (tau-leaping with error control eps).
+    n_workers:    process pool size; 1 runs in this process.
+    chunk_size:    replicates per pool task.
+    species:    also return the species copy numbers.
+    overrides:    parameter values replacing those in the .net file.
+
+    Output:
+    Returns t, the observables Y of shape (n_replicates, len(t), n_groups), the group names
+    (and the species counts of shape (n_replicates, len(t), n_species) if species=True).
+    """
+    if isinstance(model, str):
+        model = net_model.load_net(model)
+    t_out = np.linspace(0, t_end, n_steps + 1)
+    seeds = np.random.SeedSequence(seed).spawn(n_replicates)
+    tasks = [(model, overrides, t_out, seeds[i:i + chunk_size], method, eps)
+             for i in range(0, n_replicates, chunk_size)]
+    if n_workers == 1:
+        chunks = [_run_replicates(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=n_workers) as pool:
+            chunks = list(pool.map(_run_replicates, tasks))
+    X = np.concatenate(chunks)
+    net = model.compile(**overrides)
+    Y = X @ net.W
+    return (t_out, Y, net.group_names, X) if species else (t_out, Y, net.group_names)
+
+
+if __name__ == '__main__':
+    args = [a for a in sys.argv[1:] if a != '--tau']
+    t, Y, names = simulate_ssa(args[0], float(args[1]), int(args[2]), int(args[3]),
+                               seed=int(args[4]) if len(args) > 4 else None,
+                               method='tau' if '--tau' in sys.argv else 'direct', n_workers=None)
+    mean = Y.mean(axis=0); sd = Y.std(axis=0)
+    print('time ' + ' '.join(f'{n}_mean {n}_sd' for n in names))
+    for i in range(len(t)):
+        print(f'{t[i]:g} ' + ' '.join(f'{mean[i, g]:.1f} {sd[i, g]:.1f}' for g in range(len(names))))
@@ -1,11 +1,14 @@
 #!/usr/bin/env python3
 import sys
-import pandas as pd
+import spellman_data
 gn = sys.argv[1]
-df = pd.read_csv('Spellman-tidy.csv')
+data = spellman_data.load('Spellman-tidy.csv')
 
-piv = df.pivot(index='time', columns='gene', values='expression')
-corr = piv.corr()
-gc = list(corr[gn].drop(gn).sort_values(ascending=False).head(5).index)
+try:
+    gc = data.correlated(gn, 5)
+except KeyError:
+    # an unknown gene has no correlated genes: print none and exit 0 instead of a traceback
+    print(f'unknown gene {gn}', file=sys.stderr)
+    gc = []
 for g in gc:
     print(g)
@@ -1,8 +1,11 @@
 #!/usr/bin/env python3
 import sys
-import pandas as pd
+import spellman_data
 t = sys.argv[1]
 
-df = pd.read_csv('Spellman-tidy.csv')
-gn_df = df[df.gene == t]
-print(gn_df[['time', 'expression']].to_string(index=False, header=False))
\ No newline at end of file
+data = spellman_data.load('Spellman-tidy.csv')
+try:
+    print(spellman_data.format_profile(*data.profile(t)))
+except KeyError:
+    # an unknown gene has no profile: nothing on stdout and exit status 0, as with the pandas version
+    print(f'unknown gene {t}', file=sys.stderr)
\ No newline at end of file
@@ -1,7 +1,107 @@
 #!/usr/bin/env python3
+"""
+Wide (gene x time) Spellman.csv to tidy (gene, time, expression) rows, streamed in row chunks so memory stays
+bounded by the chunk size whatever the input size.
 
+CSV output is the same file pd.melt + to_csv writes (rows grouped by time, genes in file order): every
+chunk's rows for each time column are appended to a per-column spool file, and the spools are concatenated
+at the end. --columnar DIR instead writes typed .npy columns (gene: int32 codes into genes.txt, time: int16,
+expression: float32), about 10 bytes per row and memory-mappable; each chunk is written straight into its
+final position, so no spooling is needed.
+
+usage: ./process-Spellman.py [Spellman.csv] [-o Spellman-tidy.csv] [--columnar DIR] [--chunksize 10000]
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import numpy as np
 import pandas as pd
-df = pd.read_csv('Spellman.csv')
-df.rename(columns={'time': 'gene'}, inplace=True)
-df = pd.melt(df, id_vars=['gene'], var_name = 'time', value_name = 'expression')
-df.to_csv('Spellman-tidy.csv', index=False)
+
+
+def _columns(src):
+    """Name of the id column and the value (time) columns, from the header alone."""
+    header = list(pd.read_csv(src, nrows=0).columns)
+    return header[0], header[1:]
+
+
+def _chunks(src, chunksize):
+    # values are read as float64 in every chunk, so a chunk that happens to hold only whole numbers is
+    # written as 0.0 like the rest of its column, not as 0
+    _, values = _columns(src)
+    return pd.read_csv(src, chunksize=chunksize, dtype={c: np.float64 for c in values})
+
+
+def melt_csv(src, dest, chunksize=10000):
+    """Stream src into the tidy CSV dest (header gene,time,expression)."""
+    _, values = _columns(src)
+    with tempfile.TemporaryDirectory(dir=os.path.dirname(os.path.abspath(dest))) as tmp:
+        spools = [os.path.join(tmp, f'{j}.csv') for j in range(len(values))]
+        for chunk in _chunks(src, chunksize):
+            genes = chunk.iloc[:, 0]
+            for j, col in enumerate(values):
+                # opened per chunk, so a table with thousands of conditions never holds thousands of files open
+                with open(spools[j], 'a', newline='') as f:
+                    pd.DataFrame({'gene': genes, 'time': col, 'expression': chunk[col]}).to_csv(
+                        f, header=False, index=False)
+        with open(dest, 'w', newline='') as out:
+            out.write('gene,time,expression\n')
+            for path in spools:
+                if os.path.exists(path):
+                    with open(path) as f:
+                        shutil.copyfileobj(f, out)
+
+
+def melt_columnar(src, dest, chunksize=10000):
+    """
+    Stream src into the directory dest: gene.npy (int32 row of genes.txt), time.npy (int16) and
+    expression.npy (float32), one element per tidy row in the same order as melt_csv, plus genes.txt.
+    """
+    _, values = _columns(src)
+    times = np.array([int(c) for c in values])
+    if times.size and (times.min() < np.iinfo(np.int16).min or times.max() > np.iinfo(np.int16).max):
+        raise ValueError(f'{src}: time points do not fit int16')
+    with open(src) as f:
+        n_genes = sum(1 for line in f if line.strip()) - 1
+    n = n_genes*len(values)
+    os.makedirs(dest, exist_ok=True)
+    open_memmap = np.lib.format.open_memmap
+    gene = open_memmap(os.path.join(dest, 'gene.npy'), mode='w+', dtype=np.int32, shape=(n,))
+    time = open_memmap(os.path.join(dest, 'time.npy'), mode='w+', dtype=np.int16, shape=(n,))
+    expr = open_memmap(os.path.join(dest, 'expression.npy'), mode='w+', dtype=np.float32, shape=(n,))
+    start = 0
+    with open(os.path.join(dest, 'genes.txt'), 'w') as names:
+        for chunk in _chunks(src, chunksize):
+            m = len(chunk)
+            names.write(''.join(f'{g}\n' for g in chunk.iloc[:, 0]))
+            V = chunk[values].to_numpy(dtype=np.float32)
+            for j in range(len(values)):
+                rows = slice(j*n_genes + start, j*n_genes + start + m)
+                gene[rows] = np.arange(start, start + m)
+                time[rows] = times[j]
+                expr[rows] = V[:, j]
+            start += m
+    for a in (gene, time, expr):
+        a.flush()
+    return dest
+
+
+def load_columnar(dest):
+    """The columns written by melt_columnar, as (genes, gene codes, times, expression) with memmapped arrays."""
+    with open(os.path.join(dest, 'genes.txt')) as f:
+        genes = f.read().split('\n')[:-1]
+    return (genes, *(np.load(os.path.join(dest, name + '.npy'), mmap_mode='r')
+                     for name in ('gene', 'time', 'expression')))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Convert the wide Spellman table to tidy rows in bounded memory.')
+    parser.add_argument('src', nargs='?', default='Spellman.csv')
+    parser.add_argument('-o', '--output', default='Spellman-tidy.csv', help='tidy CSV to write')
+    parser.add_argument('--columnar', default=None, help='write typed .npy columns into this directory instead')
+    parser.add_argument('--chunksize', type=int, default=10000, help='wide rows per chunk')
+    args = parser.parse_args()
+    if args.columnar:
+        melt_columnar(args.src, args.columnar, args.chunksize)
+    else:
+        melt_csv(args.src, args.output, args.chunksize)
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+Gene x time matrix of the Spellman data, cached as memory-mappable .npy files.
+
+The tidy CSV is parsed (and pivoted back to wide) only once: the float32 expression matrix and the gene and
+time index arrays are saved in <csv>.cache/, together with key.json holding the source's size, mtime and
+SHA-256. Later loads memory-map the matrix without pandas; when the size or mtime no longer match, the hash
+decides whether the source really changed (then the cache is rebuilt) or was only touched.
+
+build_index() adds a correlation index to the cache: the rows are standardized once, correlations are
+computed as blocked matrix products, and only each gene's top-k neighbours (optionally also the full matrix,
+as a float32 memmap) are stored, so correlated() becomes a lookup. Without an index, correlated() computes
+the one row it needs (z @ z_g).
+
+usage: ./spellman_data.py [Spellman-tidy.csv] [--index K] [--full]    (builds or refreshes the cache)
+"""
+import hashlib
+import json
+import os
+import sys
+import numpy as np
+
+import correlation
+
+SOURCE = 'Spellman-tidy.csv'
+
+
+def _sha256(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _cache_dir(path):
+    return path + '.cache'
+
+
+def build(path=SOURCE):
+    """Parse the tidy CSV (gene, time, expression) and write the cache; returns the cache directory."""
+    import pandas as pd
+    df = pd.read_csv(path)
+    rows, genes = pd.factorize(df['gene'])  # genes in order of first appearance, as in the source
+    times = np.sort(df['time'].unique())
+    X = np.full((len(genes), len(times)), np.nan, dtype=np.float32)
+    X[rows, np.searchsorted(times, df['time'].to_numpy())] = df['expression'].to_numpy()
+    out = _cache_dir(path)
+    os.makedirs(out, exist_ok=True)
+    np.save(os.path.join(out, 'matrix.npy'), X)
+    np.save(os.path.join(out, 'genes.npy'), np.asarray(genes, dtype=str))
+    np.save(os.path.join(out, 'times.npy'), times.astype(np.int64))
+    st = os.stat(path)
+    # written last, so a half-written cache is never taken as valid
+    with open(os.path.join(out, 'key.json'), 'w') as f:
+        json.dump({'size': st.st_size, 'mtime_ns': st.st_mtime_ns, 'sha256': _sha256(path)}, f)
+    return out
+
+
+def _valid(path):
+    """True if the cache matches the source (by size and mtime, or failing that by content hash)."""
+    index = os.path.join(_cache_dir(path), 'key.json')
+    if not os.path.exists(index):
+        return False
+    with open(index) as f:
+        key = json.load(f)
+    st = os.stat(path)
+    if key['size'] == st.st_size and key['mtime_ns'] == st.st_mtime_ns:
+        return True
+    if key['size'] != st.st_size or key['sha256'] != _sha256(path):
+        return False
+    key['mtime_ns'] = st.st_mtime_ns  # same content, only touched: remember the new mtime
+    with open(index, 'w') as f:
+        json.dump(key, f)
+    return True
+
+
+def standardize(X):
+    """
+    Rows of X centred and scaled to unit norm over their observed points, with missing points set to 0, so
+    z[i] @ z[j] is the Pearson correlation of complete rows. Returns (z, ok) with z float64 and ok False for
+    rows that are constant or empty (their correlations are undefined).
+    """
+    X = np.asarray(X, dtype=np.float64)
+    obs = ~np.isnan(X)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        Xc = np.where(obs, X - (np.nansum(X, axis=1)/obs.sum(axis=1))[:, None], 0.0)
+        norm = np.sqrt(np.sum(Xc**2, axis=1))
+        ok = norm > 0
+        z = np.where(ok[:, None], Xc/norm[:, None], 0.0)
+    return z, ok
+
+
+def _top_k(R, k):
+    """Column indices of the k largest finite values of each row of R, best first (ties by index)."""
+    k = min(k, R.shape[1])
+    part = np.argpartition(-R, k - 1, axis=1)[:, :k]
+    vals = np.take_along_axis(R, part, axis=1)
+    order = np.lexsort((part, -vals), axis=1)
+    return np.take_along_axis(part, order, axis=1), np.take_along_axis(vals, order, axis=1)
+
+
+class SpellmanMatrix:
+    """
+    genes (n_genes), times (n_times) and X (n_genes x n_times float32, NaN where missing, read-only memmap),
+    plus the correlation index when one was built: neighbors/neighbor_r (n_genes x k, best first; -inf
+    marks no neighbour) and corr (full matrix memmap, or None).
+    """
+
+    def __init__(self, genes, times, X, neighbors=None, neighbor_r=None, corr=None):
+        self.genes = genes
+        self.times = times
+        self.X = X
+        self.neighbors = neighbors
+        self.neighbor_r = neighbor_r
+        self.corr = corr
+        self._row = None
+        self._z = None
+
+    def row(self, gene):
+        """Row index of gene; KeyError if it is not in the data."""
+        if self._row is None:
+            self._row = {g: i for i, g in enumerate(self.genes)}
+        return self._row[gene]
+
+    def profile(self, gene):
+        """(times, expression) of one gene over the observed time points."""
+        x = self.X[self.row(gene)]
+        keep = ~np.isnan(x)
+        return self.times[keep], x[keep]
+
+    def time_mean(self, t):
+        """Mean expression over all genes at time t (missing values skipped), accumulated in float64."""
+        j = int(np.searchsorted(self.times, t))
+        if j == len(self.times) or self.times[j] != t:
+            return np.nan
+        return float(np.nanmean(self.X[:, j], dtype=np.float64))
+
+    def correlation_row(self, gene, method='pearson', lag=0):
+        """
+        Correlation of gene's profile with every gene's (NaN for itself and for undefined pairs), pairwise
+        complete over the time points observed in both, like DataFrame.corr().
+        Pearson comes from the full stored matrix if there is one, else z @ z_g for complete data, else the
+        masked products of correlation.pearson; Spearman and lag != 0 (gene leading) use correlation.correlate.
+        """
+        g = self.row(gene)
+        if method != 'pearson' or lag:
+            r = correlation.correlate(self.X[g:g + 1], self.X, method, lag)[0]
+        elif self.corr is not None:
+            r = np.array(self.corr[g], dtype=np.float64)
+        elif not np.isnan(self.X).any():
+            if self._z is None:
+                self._z = standardize(self.X)
+            z, ok = self._z
+            r = z @ z[g]
+            r[~ok] = np.nan
+            if not ok[g]:
+                r[:] = np.nan
+        else:
+            r = correlation.pearson(self.X[g:g + 1], self.X)[0]
+        r[g] = np.nan
+        return r
+
+    def correlated(self, gene, k=5, method='pearson', lag=0):
+        """
+        The k genes whose profiles have the highest correlation with gene's, best first. For Pearson at lag 0
+        a lookup in the neighbour index when it holds at least k per gene, otherwise one correlation_row().
+        """
+        if method == 'pearson' and not lag and self.neighbors is not None and k <= self.neighbors.shape[1]:
+            g = self.row(gene)
+            return [self.genes[i] for i, r in zip(self.neighbors[g, :k], self.neighbor_r[g, :k]) if np.isfinite(r)]
+        r = self.correlation_row(gene, method, lag)
+        r[np.isnan(r)] = -np.inf
+        idx, vals = _top_k(r[None], k)
+        return [self.genes[i] for i, v in zip(idx[0], vals[0]) if np.isfinite(v)]
+
+
+def build_index(path=SOURCE, k=50, block_size=1024, full=False):
+    """
+    Store each gene's k most correlated genes (and with full=True the whole correlation matrix) in the cache.
+    Correlations are computed for blocks of block_size rows, so memory stays at block_size x n_genes: as
+    z @ z.T for complete data such as Spellman's, with correlation.pearson's masked products otherwise.
+    """
+    data = load(path, index=False)
+    out = _cache_dir(path)
+    z, ok = standardize(data.X)
+    complete = not np.isnan(data.X).any()
+    n = len(z)
+    k = min(k, n - 1)
+    neighbors = np.empty((n, k), dtype=np.int32)
+    neighbor_r = np.empty((n, k), dtype=np.float32)
+    corr = np.lib.format.open_memmap(os.path.join(out, 'corr.npy'), mode='w+', dtype=np.float32,
+                                     shape=(n, n)) if full else None
+    for start in range(0, n, block_size):
+        stop = min(start + block_size, n)
+        R = z[start:stop] @ z.T if complete else correlation.pearson(data.X[start:stop], data.X)
+        R[:, ~ok] = np.nan
+        R[~ok[start:stop]] = np.nan
+        R[np.arange(stop - start), np.arange(start, stop)] = np.nan
+        if full:
+            corr[start:stop] = R
+        R[np.isnan(R)] = -np.inf
+        neighbors[start:stop], neighbor_r[start:stop] = _top_k(R, k)
+    if full:
+        corr.flush()
+        del corr
+    elif os.path.exists(os.path.join(out, 'corr.npy')):
+        os.remove(os.path.join(out, 'corr.npy'))
+    np.save(os.path.join(out, 'neighbors.npy'), neighbors)
+    np.save(os.path.join(out, 'neighbor_r.npy'), neighbor_r)
+    with open(os.path.join(out, 'key.json')) as f:
+        sha = json.load(f)['sha256']
+    # written last and tied to the data's hash, so an index from an older source is never used
+    with open(os.path.join(out, 'index.json'), 'w') as f:
+        json.dump({'sha256': sha, 'k': k, 'full': full}, f)
+    return out
+
+
+def load(path=SOURCE, index=True):
+    """
+    SpellmanMatrix for the tidy CSV at path, building the cache first if it is missing or stale.
+    With index=True the correlation index is attached when build_index() has made one for this data.
+    """
+    if not _valid(path):
+        build(path)
+    out = _cache_dir(path)
+    genes = np.load(os.path.join(out, 'genes.npy')).tolist()
+    times = np.load(os.path.join(out, 'times.npy'))
+    data = SpellmanMatrix(genes, times, np.load(os.path.join(out, 'matrix.npy'), mmap_mode='r'))
+    meta = os.path.join(out, 'index.json')
+    if index and os.path.exists(meta):
+        with open(meta) as f:
+            info = json.load(f)
+        with open(os.path.join(out, 'key.json')) as f:
+            current = json.load(f)['sha256'] == info['sha256']
+        if current:
+            data.neighbors = np.load(os.path.join(out, 'neighbors.npy'), mmap_mode='r')
+            data.neighbor_r = np.load(os.path.join(out, 'neighbor_r.npy'), mmap_mode='r')
+            if info['full']:
+                data.corr = np.load(os.path.join(out, 'corr.npy'), mmap_mode='r')
+    return data
+
+
+def format_profile(times, values):
+    """
+    Two right-aligned columns like DataFrame.to_string(index=False, header=False): the values with six
+    decimals, trailing zeros trimmed by the same amount for the whole column.
+    """
+    if len(times) == 0:
+        return ''
+    t = [str(v) for v in times]
+    e = [f'{v:.6f}' for v in np.asarray(values, dtype=np.float64)]
+    while all(s.endswith('0') and len(s.split('.')[1]) > 1 for s in e):
+        e = [s[:-1] for s in e]
+    wt = max(map(len, t)); we = max(map(len, e))
+    return '\n'.join(f'{a:>{wt}} {b:>{we}}' for a, b in zip(t, e))
+
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    k = None
+    if '--index' in args:
+        i = args.index('--index'); k = int(args[i + 1]); del args[i:i + 2]
+    full = '--full' in args
+    args = [a for a in args if a != '--full']
+    path = args[0] if args else SOURCE
+    print(build(path) if k is None and not full else build_index(path, k or 50, full=full))
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Resident query mode for the Spellman data: load the matrix once, then answer many queries in one process.
+
+Queries are single lines:
+    profile GENE                        expression of GENE at every time point (gene-expression.py)
+    mean TIME                           mean expression at TIME over all genes (time-expression.py)
+    corr GENE [K] [spearman] [lag=L]    the K (default 5) most correlated genes (correlated-genes.py)
+A bare integer is read as 'mean', any other bare word as 'profile'.
+
+--stdio answers queries from stdin and --socket PATH / --port N from a local Unix or TCP socket (one thread
+per connection), each with one JSON line per query: {"query": ..., "result": ...} or {"query": ..., "error": ...}.
+--batch FILE answers every query in FILE (one per line, '-' for stdin) as TSV: query, then the result.
+
+usage: ./spellman_server.py (--stdio | --socket PATH | --port N | --batch FILE) [--data Spellman-tidy.csv]
+"""
+import argparse
+import json
+import os
+import socketserver
+import stat
+import sys
+
+import numpy as np
+
+import spellman_data
+
+
+def _value(v):
+    """float32 value as the shortest float that reads back to it (0.215, not 0.2150000035762787)."""
+    return float(str(v))
+
+
+def answer(data, query):
+    """Answer one query line; returns a JSON-ready result (list or float). Raises KeyError/ValueError."""
+    words = query.split()
+    if not words:
+        raise ValueError('empty query')
+    if len(words) == 1:
+        words = ['mean' if words[0].lstrip('-').isdigit() else 'profile'] + words
+    kind, arg, rest = words[0], words[1], words[2:]
+    if kind == 'profile':
+        times, values = data.profile(arg)
+        return [[int(t), _value(v)] for t, v in zip(times, values)]
+    if kind == 'mean':
+        if int(arg) not in data.times:
+            raise KeyError(arg)
+        return data.time_mean(int(arg))
+    if kind == 'corr':
+        k = 5; method = 'pearson'; lag = 0
+        for w in rest:
+            if w.isdigit():
+                k = int(w)
+            elif w in ('pearson', 'spearman'):
+                method = w
+            elif w.startswith('lag='):
+                lag = int(w[len('lag='):])
+            else:
+                raise ValueError(f'unknown corr option {w!r}')
+        return data.correlated(arg, k, method=method, lag=lag)
+    raise ValueError(f'unknown query {kind!r}; use profile, mean or corr')
+
+
+def answer_json(data, query):
+    query = query.strip()
+    try:
+        return json.dumps({'query': query, 'result': answer(data, query)})
+    except (KeyError, ValueError) as e:
+        return json.dumps({'query': query, 'error': f'{type(e).__name__}: {e}'})
+
+
+def serve_stream(data, lines, out):
+    """Answer every non-empty line as one JSON line, flushing after each so clients can wait on replies."""
+    for line in lines:
+        if line.strip():
+            out.write(answer_json(data, line) + '\n')
+            out.flush()
+
+
+def serve_socket(data, path=None, port=None):
+    """Serve queries on a Unix socket at path, or on 127.0.0.1:port, until interrupted."""
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            for raw in self.rfile:
+                line = raw.decode().strip()
+                if line:
+                    self.wfile.write((answer_json(data, line) + '\n').encode())
+                    self.wfile.flush()
+
+    if path is not None:
+        # a stale socket from an earlier run is replaced, but any other file at path is left alone
+        if os.path.exists(path):
+            if not stat.S_ISSOCK(os.stat(path).st_mode):
+                sys.exit(f'{path} exists and is not a socket; not removing it')
+            os.remove(path)
+        server = socketserver.ThreadingUnixStreamServer(path, Handler)
+    else:
+        server = socketserver.ThreadingTCPServer(('127.0.0.1', port), Handler)
+    server.daemon_threads = True
+    with server:
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+    if path is not None and os.path.exists(path) and stat.S_ISSOCK(os.stat(path).st_mode):
+        os.remove(path)
+
+
+def run_batch(data, lines, out):
+    """Answer every query line as TSV: the query, then the result (profile rows and gene lists comma-joined)."""
+    for line in lines:
+        query = line.strip()
+        if not query:
+            continue
+        try:
+            res = answer(data, query)
+        except (KeyError, ValueError) as e:
+            res = f'error: {type(e).__name__}: {e}'
+        if isinstance(res, list):
+            res = ','.join(f'{r[0]}:{r[1]}' if isinstance(r, list) else r for r in res)
+        out.write(f'{query}\t{res}\n')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Answer Spellman profile/mean/corr queries from one resident process.')
+    mode = parser.add_mutually_exclusive_group(required=True)
+    mode.add_argument('--stdio', action='store_true', help='JSON-lines server on stdin/stdout')
+    mode.add_argument('--socket', help='JSON-lines server on this Unix socket path')
+    mode.add_argument('--port', type=int, help='JSON-lines server on 127.0.0.1:PORT')
+    mode.add_argument('--batch', help="file of queries ('-' for stdin); TSV answers")
+    parser.add_argument('--data', default=spellman_data.SOURCE, help='tidy CSV (default %(default)s)')
+    args = parser.parse_args()
+
+    data = spellman_data.load(args.data)
+    data.X = np.array(data.X)  # read the memmap into memory once, so no query touches the disk
+    if args.stdio:
+        serve_stream(data, sys.stdin, sys.stdout)
+    elif args.batch is not None:
+        with (sys.stdin if args.batch == '-' else open(args.batch)) as f:
+            run_batch(data, f, sys.stdout)
+    else:
+        serve_socket(data, args.socket, args.port)
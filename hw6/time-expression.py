@@ -1,8 +1,7 @@
 #!/usr/bin/env python3
 import sys
-import pandas as pd
+import spellman_data
 t = sys.argv[1]
-df = pd.read_csv('Spellman-tidy.csv')
+data = spellman_data.load('Spellman-tidy.csv')
 
-t_df = df[df.time == int(t)]
-print(t_df['expression'].mean())
\ No newline at end of file
+print(data.time_mean(int(t)))
\ No newline at end of file